@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+warnings.filterwarnings("ignore")
+warnings.simplefilter(action="ignore", category=FutureWarning)
+
+import numpy as np
+
+from models import list_models, build_classifier, as_model_input
+from scheduler import apply_core_budget
+
+BENCH_SEED = 42
+
+## Measurements compared against a baseline; higher is worse for all of them
+REGRESSION_METRICS = ["fit_wall_s", "predict_wall_s", "peak_rss_mb"]
+
+## Smallest absolute growth (seconds or MB) that can count as a regression; below it,
+## relative changes of sub-millisecond timings are just noise
+REGRESSION_FLOORS = {"fit_wall_s": 0.05, "predict_wall_s": 0.05, "peak_rss_mb": 20.0}
+
+## Fields that identify a benchmark case across runs
+CASE_KEYS = ["model", "dataset", "resolution", "n_buildings", "data_limit"]
+
+
+def synthetic_dataset(n_buildings, data_limit, resolution=15, random_state=BENCH_SEED):
+    """
+    Random meter-like series: a noisy base load plus, for positive buildings, a daily
+    on/off block, so every model has something to learn.
+
+    Returns:
+        tuple: (X float32 of shape (n_buildings, data_limit), y int array)
+    """
+    rng = np.random.RandomState(random_state)
+    y = (rng.rand(n_buildings) < 0.5).astype(int)
+    points_per_day = max(1, 24 * 60 // resolution)
+    hour = (np.arange(data_limit) % points_per_day) * 24 / points_per_day
+    daily_block = ((hour >= 8) & (hour < 18)).astype(np.float32)
+
+    X = rng.gamma(2.0, 10.0, size=(n_buildings, 1)).astype(np.float32)
+    X = X + rng.normal(0, 2.0, size=(n_buildings, data_limit)).astype(np.float32)
+    X += y[:, np.newaxis] * rng.uniform(5, 20, size=(n_buildings, 1)).astype(np.float32) * daily_block
+    return X, y
+
+
+def comstock_dataset(n_buildings, data_file, label_file, appliance, resolution=None, data_limit=None,
+                     cache_dir=None, random_state=BENCH_SEED):
+    """
+    A random subset of ``n_buildings`` buildings from the cached ComStock data.
+
+    Returns:
+        tuple: (X float32 of shape (n_buildings, data_limit), y int array)
+    """
+    from cache import open_series, open_labels, check_label_ids
+
+    store = open_series(data_file, cache_dir, resolution)
+    labels = open_labels(label_file, cache_dir)
+    check_label_ids(store.buildings, labels.ids)
+    rows = np.sort(np.random.RandomState(random_state).choice(
+        store.X.shape[0], min(n_buildings, store.X.shape[0]), replace=False))
+    X = np.asarray(store.X[rows, :data_limit])
+    y = np.asarray(labels.Y[rows, labels.columns.index(appliance)])
+    return X, y
+
+
+def rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case):
+    """
+    Benchmark one (model, dataset) case; runs in a fresh process so peak RSS is its own.
+
+    Returns:
+        dict: The case fields plus wall/CPU time, throughput and memory of fit and predict.
+    """
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import train_test_split
+    from threadpoolctl import threadpool_limits
+
+    record = dict(case)
+    try:
+        if case["dataset"] == "synthetic":
+            X, y = synthetic_dataset(case["n_buildings"], case["data_limit"], case["resolution"])
+        else:
+            X, y = comstock_dataset(case["n_buildings"], case["data_file"], case["label_file"], case["appliance"],
+                                    case["resolution"], case["data_limit"], case["cache_dir"])
+        X = as_model_input(case["model"], X)
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y)), test_size=case["test_size"], stratify=y, random_state=BENCH_SEED)
+        clf = apply_core_budget(build_classifier(case["model"]), case["n_jobs"])
+        record.update(n_buildings=len(y), data_limit=X.shape[1], n_train=len(train_idx), n_test=len(test_idx),
+                      base_rss_mb=rss_mb())
+
+        with threadpool_limits(limits=case["n_jobs"]):
+            wall, cpu = time.perf_counter(), time.process_time()
+            clf.fit(X[train_idx], y[train_idx])
+            fit_wall, fit_cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+            wall, cpu = time.perf_counter(), time.process_time()
+            y_pred = clf.predict(X[test_idx])
+            predict_wall, predict_cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        record.update(
+            fit_wall_s=fit_wall,
+            fit_cpu_s=fit_cpu,
+            fit_buildings_per_s=len(train_idx) / max(fit_wall, 1e-9),
+            predict_wall_s=predict_wall,
+            predict_cpu_s=predict_cpu,
+            predict_buildings_per_s=len(test_idx) / max(predict_wall, 1e-9),
+            peak_rss_mb=rss_mb(),
+            f1=f1_score(y[test_idx], y_pred, zero_division=0),
+            error=None,
+        )
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def plan_cases(args):
+    """Expand the command line into the list of benchmark cases."""
+    common = {"test_size": args.test_size, "n_jobs": args.n_jobs, "data_file": args.data,
+              "label_file": args.labels, "appliance": args.appliance, "cache_dir": args.cache_dir}
+    cases = []
+    for model in args.models:
+        for n_buildings in args.sizes:
+            for data_limit in args.lengths:
+                cases.append(dict(common, model=model, dataset="synthetic", resolution=args.synthetic_resolution,
+                                  n_buildings=n_buildings, data_limit=data_limit))
+            if args.data is not None:
+                for resolution in args.resolutions or [None]:
+                    cases.append(dict(common, model=model, dataset="comstock", resolution=resolution,
+                                      n_buildings=n_buildings, data_limit=None))
+    return cases
+
+
+def case_key(record):
+    return tuple(record.get(key) for key in CASE_KEYS)
+
+
+def compare_to_baseline(records, baseline, tolerance):
+    """
+    Find measurements that got worse than the baseline by more than ``tolerance`` (relative)
+    and by more than their ``REGRESSION_FLOORS`` entry (absolute).
+
+    Returns:
+        list[dict]: One entry per regressed (case, metric).
+    """
+    previous = {case_key(record): record for record in baseline if record.get("error") is None}
+    regressions = []
+    for record in records:
+        reference = previous.get(case_key(record))
+        if reference is None or record.get("error") is not None:
+            continue
+        for metric in REGRESSION_METRICS:
+            ratio = record[metric] / max(reference[metric], 1e-9)
+            if ratio > 1 + tolerance and record[metric] - reference[metric] > REGRESSION_FLOORS[metric]:
+                regressions.append({**{key: record[key] for key in CASE_KEYS}, "metric": metric,
+                                    "baseline": reference[metric], "current": record[metric], "ratio": ratio})
+    return regressions
+
+
+def write_records(records, output_file):
+    """Write the records as JSON, or as CSV when ``output_file`` ends in ``.csv``."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    if output_file.endswith(".csv"):
+        import pandas as pd
+
+        pd.DataFrame(records).to_csv(output_file, index=False)
+    else:
+        with open(output_file, "w") as f:
+            json.dump(records, f, indent=2, default=str)
+
+
+def read_records(path):
+    if path.endswith(".csv"):
+        import pandas as pd
+
+        return pd.read_csv(path).replace({np.nan: None}).to_dict(orient="records")
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def bench(args):
+    cases = plan_cases(args)
+    logging.info(f"🏁 Benchmarking {len(cases)} cases ({len(args.models)} models)")
+
+    # One fresh interpreter per case: peak RSS and imports are not shared between models
+    records = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+        for record in pool.map(run_case, cases):
+            records.append(record)
+            if record["error"] is not None:
+                logging.error(f"❌ {record['model']} on {record['dataset']} ({record['n_buildings']} buildings): "
+                              f"{record['error']}")
+                continue
+            logging.info(f"   • {record['model']:<25s} {record['dataset']:<9s} res={record['resolution']} "
+                         f"n={record['n_buildings']:<5d} T={record['data_limit']:<5d} "
+                         f"fit {record['fit_wall_s']:.2f}s ({record['fit_buildings_per_s']:.1f} bldg/s) "
+                         f"predict {record['predict_wall_s']:.2f}s ({record['predict_buildings_per_s']:.1f} bldg/s) "
+                         f"peak RSS {record['peak_rss_mb']:.0f} MB")
+
+    write_records(records, args.output)
+    logging.info(f"📁 Benchmark results saved to: {args.output}")
+
+    if args.baseline is None:
+        return 0
+    regressions = compare_to_baseline(records, read_records(args.baseline), args.tolerance)
+    for regression in regressions:
+        logging.warning(f"⚠️  REGRESSION {regression['model']} on {regression['dataset']} "
+                        f"(n={regression['n_buildings']}, T={regression['data_limit']}): {regression['metric']} "
+                        f"{regression['baseline']:.2f} → {regression['current']:.2f} (×{regression['ratio']:.2f})")
+    logging.info(f"📊 {len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fit/predict time and memory of the NILS models.")
+    parser.add_argument("--models", nargs="+", default=["Dummy", "Rocket", "Minirocket"], choices=list_models(),
+                        help="Models to benchmark")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 300, 1000], help="Numbers of buildings")
+    parser.add_argument("--lengths", nargs="+", type=int, default=[168, 672],
+                        help="Series lengths (data_limit) of the synthetic datasets")
+    parser.add_argument("--synthetic-resolution", type=int, default=15,
+                        help="Resolution in minutes the synthetic daily pattern is drawn at")
+    parser.add_argument("--data", type=str, default=None, help="Wide meter CSV for ComStock-derived cases")
+    parser.add_argument("--labels", type=str, default=None, help="Label CSV matching --data")
+    parser.add_argument("--appliance", type=str, default="cooling_ON", help="Label column of the ComStock cases")
+    parser.add_argument("--resolutions", nargs="+", type=int, default=None,
+                        help="Resolutions (minutes) derived from --data; defaults to the file's own")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Directory for the binary data cache")
+    parser.add_argument("--test-size", type=float, default=0.3, help="Share of buildings used for predict")
+    parser.add_argument("--n-jobs", type=int, default=1, help="Cores given to each model")
+    parser.add_argument("--output", type=str, default="results/bench.json", help="Output file (.json or .csv)")
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative slowdown/memory growth reported as a regression")
+    args = parser.parse_args()
+    if args.data is not None and args.labels is None:
+        parser.error("--labels is required with --data")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-8s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+    sys.exit(bench(args))
@@ -0,0 +1,315 @@
+import os
+import json
+import hashlib
+import logging
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME = ".nils_cache"
+CACHE_VERSION = 2
+
+## Parsed CSV values (float32 bytes) held in memory at once while building the series cache
+CSV_CHUNK_BYTES = 64 << 20
+
+SeriesStore = namedtuple("SeriesStore", ["X", "buildings", "timestamps", "digest"])
+LabelStore = namedtuple("LabelStore", ["Y", "columns", "ids", "digest"])
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 content hash of a file without reading it into memory at once.
+
+    Parameters:
+        path (str): File to hash.
+        chunk_size (int): Number of bytes read per iteration.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def count_rows(path, chunk_size=1 << 20):
+    """Number of data rows (lines after the header) of a CSV, counted without parsing it."""
+    lines, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    # A last line without a trailing newline still counts
+    return lines + (last != b"\n") - 1
+
+
+def cache_path_for(source_file, cache_dir=None):
+    """
+    Resolve the cache directory used for a given source CSV.
+
+    By default the cache lives next to the source file in a ``.nils_cache`` folder,
+    one sub-directory per CSV (named after the file without its extension).
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(source_file)), CACHE_DIRNAME)
+    stem = os.path.splitext(os.path.basename(source_file))[0]
+    return os.path.join(cache_dir, stem)
+
+
+def _read_meta(path):
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r") as f:
+        return json.load(f)
+
+
+def _write_meta(path, meta):
+    # meta.json is written last and atomically: its presence marks a complete cache
+    tmp_path = os.path.join(path, f"meta.json.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+
+def _save_array(path, name, array):
+    tmp_path = os.path.join(path, f"{name}.{os.getpid()}.tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+
+
+def _is_fresh(source_file, path):
+    """
+    Check whether the cache at ``path`` still matches ``source_file``.
+
+    A matching size and mtime is trusted as-is; otherwise the content hash decides,
+    so touching a file without changing it does not force a rebuild.
+    """
+    meta = _read_meta(path)
+    if meta is None or meta.get("version") != CACHE_VERSION:
+        return None
+
+    stat = os.stat(source_file)
+    if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+        return meta
+
+    digest = file_digest(source_file)
+    if digest != meta["digest"]:
+        logging.info(f"♻️  Cache for {source_file} is stale (content hash changed)")
+        return None
+
+    meta["size"] = stat.st_size
+    meta["mtime_ns"] = stat.st_mtime_ns
+    _write_meta(path, meta)
+    return meta
+
+
+def _source_meta(source_file):
+    stat = os.stat(source_file)
+    return {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(source_file),
+        "digest": file_digest(source_file),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def build_series_cache(data_file, path):
+    """
+    Convert a wide meter CSV (one row per timestamp, one column per building) into
+    a buildings x time float32 matrix stored as ``.npy`` files under ``path``.
+
+    The CSV is streamed in blocks of rows parsed straight to float32 and written into a
+    preallocated memory-mapped matrix, so memory use is bounded by ``CSV_CHUNK_BYTES``
+    rather than by the size of the file.
+    """
+    logging.info(f"🛠️  Building binary cache for {data_file} in {path}")
+    os.makedirs(path, exist_ok=True)
+    meta = _source_meta(data_file)
+
+    columns = pd.read_csv(data_file, nrows=0).columns
+    has_timestamps = "Timestamp" in columns
+    buildings = columns.drop("Timestamp").to_numpy(dtype=str) if has_timestamps else columns.to_numpy(dtype=str)
+    n_points = count_rows(data_file)
+    chunk_rows = max(1, CSV_CHUNK_BYTES // (4 * max(1, len(buildings))))
+
+    tmp_path = os.path.join(path, f"series.{os.getpid()}.tmp.npy")
+    series = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(buildings), n_points))
+    timestamps = []
+    start = 0
+    reader = pd.read_csv(data_file, chunksize=chunk_rows, dtype={building: np.float32 for building in buildings})
+    for chunk in reader:
+        if start + len(chunk) > n_points:
+            raise ValueError(f"{data_file} has more rows than lines; quoted line breaks are not supported")
+        if has_timestamps:
+            timestamps.append(chunk.pop("Timestamp").astype(str).to_numpy(dtype=str))
+        series[:, start:start + len(chunk)] = chunk.to_numpy(dtype=np.float32).T
+        start += len(chunk)
+    if start != n_points:
+        raise ValueError(f"Read {start} rows from {data_file}, expected {n_points}")
+    series.flush()
+    del series
+    os.replace(tmp_path, os.path.join(path, "series.npy"))
+    timestamps = np.concatenate(timestamps) if has_timestamps else np.arange(n_points).astype(str)
+
+    _save_array(path, "buildings", buildings)
+    _save_array(path, "timestamps", timestamps)
+
+    meta["shape"] = [len(buildings), len(timestamps)]
+    _write_meta(path, meta)
+    logging.info(f"✅ Cached {len(buildings)} buildings × {len(timestamps)} time points")
+    return meta
+
+
+def build_label_cache(label_file, path):
+    """
+    Convert a label CSV (one row per building, one column per appliance) into an
+    integer label matrix, its column names and the building IDs.
+    """
+    logging.info(f"🛠️  Building binary cache for {label_file} in {path}")
+    os.makedirs(path, exist_ok=True)
+    meta = _source_meta(label_file)
+
+    df_labels = pd.read_csv(label_file)
+    # Without an id column the rows are assumed to follow the data columns; ids stays empty
+    if "id" in df_labels.columns:
+        ids = df_labels.pop("id").astype(str).to_numpy(dtype=str)
+    else:
+        ids = np.array([], dtype=str)
+    df_labels = df_labels.select_dtypes(include="number")
+
+    _save_array(path, "labels", df_labels.to_numpy())
+    _save_array(path, "ids", ids)
+
+    meta["columns"] = list(df_labels.columns)
+    meta["shape"] = list(df_labels.shape)
+    _write_meta(path, meta)
+    return meta
+
+
+def open_series(data_file, cache_dir=None, resolution=None):
+    """
+    Open the memory-mapped series matrix for ``data_file``, building the cache on first use.
+
+    Parameters:
+        data_file (str): Wide meter CSV.
+        cache_dir (str, optional): Root directory for cached files.
+        resolution (int, optional): Sampling interval in minutes; a coarser resolution than
+            the CSV's is derived from the cached series by block averaging (see ``resample_series``).
+
+    Returns:
+        SeriesStore: ``X`` is a read-only float32 memmap of shape (buildings, time).
+    """
+    path = cache_path_for(data_file, cache_dir)
+    meta = _is_fresh(data_file, path)
+    if meta is None:
+        meta = build_series_cache(data_file, path)
+
+    X = np.load(os.path.join(path, "series.npy"), mmap_mode="r")
+    buildings = np.load(os.path.join(path, "buildings.npy"))
+    timestamps = np.load(os.path.join(path, "timestamps.npy"))
+
+    factor = resample_factor(series_resolution(timestamps), resolution)
+    if factor > 1:
+        # Derived series are kept beside the base one, tagged with the digest they were built from
+        name = f"series_{resolution}min_{meta['digest'][:12]}"
+        if not os.path.exists(os.path.join(path, f"{name}.npy")):
+            logging.info(f"🛠️  Resampling {data_file} to {resolution}-minute resolution (blocks of {factor})")
+            _save_array(path, name, resample_series(X, factor))
+        X = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        timestamps = timestamps[:X.shape[1] * factor:factor]
+    return SeriesStore(X, buildings, timestamps, meta["digest"])
+
+
+def open_labels(label_file, cache_dir=None):
+    """
+    Open the cached label matrix for ``label_file``, building the cache on first use.
+
+    Returns:
+        LabelStore: ``Y`` has one row per building and one column per entry of ``columns``.
+    """
+    path = cache_path_for(label_file, cache_dir)
+    meta = _is_fresh(label_file, path)
+    if meta is None:
+        meta = build_label_cache(label_file, path)
+
+    Y = np.load(os.path.join(path, "labels.npy"), mmap_mode="r")
+    ids = np.load(os.path.join(path, "ids.npy"))
+    return LabelStore(Y, meta["columns"], ids, meta["digest"])
+
+
+def check_label_ids(buildings, ids):
+    """
+    Check that label row ``i`` describes data column ``i``.
+
+    Data columns are named ``<id>-<n>`` (e.g. ``73206-0``); the part before the first
+    ``-`` must equal the label file's ``id``. Labels without ids are not checked.
+
+    Raises:
+        ValueError: If the counts differ or any id does not match its column.
+    """
+    if len(ids) == 0:
+        return
+    if len(ids) != len(buildings):
+        raise ValueError(f"The label file has {len(ids)} buildings but the data file has {len(buildings)} columns")
+    prefixes = np.char.partition(np.asarray(buildings, dtype=str), "-")[:, 0]
+    mismatched = np.flatnonzero(prefixes != np.asarray(ids, dtype=str))
+    if len(mismatched):
+        i = mismatched[0]
+        raise ValueError(f"{len(mismatched)} label ids do not match the data column headers "
+                         f"(first at row {i}: id {ids[i]} vs column {buildings[i]})")
+
+
+def series_resolution(timestamps):
+    """
+    Sampling interval of a cached series in minutes, or ``None`` when the timestamps are not dates.
+    """
+    if len(timestamps) < 2:
+        return None
+    try:
+        first, second = pd.to_datetime(timestamps[:2])
+    except (ValueError, TypeError):
+        return None
+    return int((second - first).total_seconds() // 60)
+
+
+def resample_factor(base_resolution, resolution):
+    """
+    Number of base time points averaged into one point at ``resolution`` minutes.
+
+    Raises:
+        ValueError: If ``resolution`` is finer than, or not a multiple of, the base resolution.
+    """
+    if resolution is None or resolution == base_resolution:
+        return 1
+    if base_resolution is None:
+        raise ValueError(f"Cannot resample to {resolution} minutes: the series has no timestamps")
+    if resolution < base_resolution or resolution % base_resolution:
+        raise ValueError(f"Cannot resample {base_resolution}-minute data to {resolution} minutes: "
+                         f"the resolution must be a multiple of {base_resolution}")
+    return resolution // base_resolution
+
+
+def resample_series(X, factor, chunk_size=4096):
+    """
+    Aggregate a buildings x time matrix into non-overlapping blocks of ``factor`` points.
+
+    Each block is replaced by its mean (the average power over the longer interval), so
+    60-minute data built from 15-minute data matches a native 60-minute export. Trailing
+    points that do not fill a whole block are dropped. Buildings are processed in chunks
+    so a memory-mapped input is never materialised at once.
+
+    Returns:
+        np.ndarray: float32 matrix of shape (buildings, time // factor).
+    """
+    n_buildings, n_points = X.shape
+    n_blocks = n_points // factor
+    out = np.empty((n_buildings, n_blocks), dtype=np.float32)
+    for start in range(0, n_buildings, chunk_size):
+        block = X[start:start + chunk_size, :n_blocks * factor]
+        out[start:start + chunk_size] = block.reshape(len(block), n_blocks, factor).mean(axis=2, dtype=np.float64)
+    return out
@@ -1,4 +1,5 @@
 import os
+import copy
 import yaml
 import logging
 import argparse
@@ -7,19 +8,27 @@ import warnings
 warnings.filterwarnings("ignore")
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
-from sklearn.model_selection import train_test_split
-
-# from .models import define_all_classifiers, select_classifiers
-from models import define_all_classifiers, select_classifiers
-from metrics import compute_metrics
+from models import select_classifiers, select_regressors, list_models, as_model_input, MODEL_COST
+from metrics import compute_metrics, compute_count_metrics, summarize_folds, best_threshold
+from cache import open_series, open_labels, cache_path_for, series_resolution, resample_factor, check_label_ids
+from features import (KERNEL_MODELS, KernelHead, KernelRegressionHead, KernelPipeline, FeatureCache,
+                      transform_is_data_independent, check_feature_cache)
+from splits import iterative_train_test_split, cross_validation_folds
+from scheduler import plan_jobs, run_jobs, apply_core_budget, resolve_n_jobs, job_key
+from journal import Journal, config_hash
+from model_store import ModelStore, PerApplianceModel, predict_with_scores, infer_score_type
+from halving import successive_halving
+from instrument import span, profile, start_trace, configure as configure_instrumentation
+from windows import WindowedClassifier, DEFAULT_MAX_WINDOWS
 
 RANDOM_SEED = 42
 
 
-def setup_logging(log_path):
+def setup_logging(log_path, resume=False):
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
     
     # Create formatters for different log levels
@@ -29,7 +38,8 @@ def setup_logging(log_path):
     )
     
     # Setup file handler
-    file_handler = logging.FileHandler(log_path, mode="w")
+    # A resumed run keeps the log of the interrupted one
+    file_handler = logging.FileHandler(log_path, mode="a" if resume else "w")
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(detailed_formatter)
     
@@ -41,7 +51,8 @@ def setup_logging(log_path):
     # Configure root logger
     logging.basicConfig(
         level=logging.INFO,
-        handlers=[file_handler, console_handler]
+        handlers=[file_handler, console_handler],
+        force=True
     )
     
     # Log initial setup information
@@ -53,48 +64,51 @@ def setup_logging(log_path):
     logging.info("="*80)
 
 
-def load_data(appliance, data_file, label_file, data_limit):
+def load_series(data_file, data_limit, cache_dir=None, resolution=None, dtype="float32"):
+    """
+    The buildings x time matrix a run trains on, opened once and shared by every model and appliance.
+
+    In the cache's float32 this is a zero-copy slice of the memory-mapped cache;
+    ``dtype="float64"`` materialises one converted copy, for double-precision runs.
+    """
+    X = open_series(data_file, cache_dir, resolution).X[:, :data_limit]
+    return np.asarray(X, dtype=dtype)
+
+
+def load_data(appliance, data_file, label_file, data_limit, cache_dir=None, resolution=None):
     logging.info(f"📊 LOADING DATA FOR APPLIANCE: {appliance.upper()}")
     logging.info("-" * 60)
     
-    # Load time series data
+    # Open the memory-mapped series matrix (built from the CSV on first use)
     logging.info(f"📁 Loading time series data from: {data_file}")
-    df_data = pd.read_csv(data_file)
-    logging.info(f"✅ Loaded data shape: {df_data.shape} (rows={df_data.shape[0]}, cols={df_data.shape[1]})")
+    store = open_series(data_file, cache_dir, resolution)
+    logging.info(f"✅ Loaded data shape: {store.X.shape} (buildings={store.X.shape[0]}, time points={store.X.shape[1]})")
     
-    # Remove timestamp column if present
-    if "Timestamp" in df_data.columns:
-        df_data = df_data.drop("Timestamp", axis=1)
-        logging.info("🗓️  Removed timestamp column from data")
-    
-    # Limit data to specified number of time points
-    original_length = len(df_data)
-    df_data = df_data.head(data_limit)
-    logging.info(f"⏱️  Limited data from {original_length} to {data_limit} time points")
-    logging.info(f"📏 Final data shape after preprocessing: {df_data.shape}")
-    
-    # Transpose data (buildings as rows, time as features)
-    X = df_data.T.values
-    logging.info(f"🔄 Transposed data: {X.shape} (buildings={X.shape[0]}, time_features={X.shape[1]})")
+    # Limit data to specified number of time points (zero-copy slice of the cache);
+    # None keeps the whole series for windowed training
+    original_length = store.X.shape[1]
+    X = store.X[:, :data_limit]
+    logging.info(f"⏱️  Limited data from {original_length} to {X.shape[1]} time points")
+    logging.info(f"🔄 Final data shape: {X.shape} (buildings={X.shape[0]}, time_features={X.shape[1]})")
 
     # Load appliance labels
     logging.info(f"🏷️  Loading appliance labels from: {label_file}")
-    df_labels = pd.read_csv(label_file)
-    logging.info(f"✅ Loaded labels shape: {df_labels.shape}")
+    labels = open_labels(label_file, cache_dir)
+    logging.info(f"✅ Loaded labels shape: {labels.Y.shape}")
     
     # Validate appliance exists in labels
-    available_appliances = [col for col in df_labels.columns if col.endswith('_ON')]
+    available_appliances = [col for col in labels.columns if col.endswith('_ON')]
     logging.info(f"🔍 Available appliances: {available_appliances}")
     
-    if appliance not in df_labels.columns:
+    if appliance not in labels.columns:
         error_msg = f"❌ CRITICAL ERROR: Appliance '{appliance}' not found in label file!"
         logging.error(error_msg)
-        logging.error(f"Available columns: {list(df_labels.columns)}")
+        logging.error(f"Available columns: {labels.columns}")
         print(f"Error: appliance '{appliance}' not found in label file. See log for details.")
         exit(1)
     
     # Extract labels for target appliance
-    y = df_labels[appliance].values
+    y = np.asarray(labels.Y[:, labels.columns.index(appliance)])
     positive_samples = sum(y)
     negative_samples = len(y) - positive_samples
     positive_ratio = positive_samples / len(y) * 100
@@ -109,14 +123,119 @@ def load_data(appliance, data_file, label_file, data_limit):
     return X, y
 
 
-def fit_and_evaluate(appliance, classifiers, X, y, test_size, output_path):    
+def evaluate_model(appliance, clf_name, clf, X, y, train_idx, test_idx, feature_cache=None, model_store=None):
+    """
+    Train one model on the training rows, score it on the test rows and return a one-row result frame.
+
+    The fitted model is saved to ``model_store`` when one is given.
+    """
+    # The training and test rows are copied out of X only when the model needs them, one at a time
+    y_train, y_test = y[train_idx], y[test_idx]
+    logging.info("   📝 Algorithm: %s", type(clf).__name__)
+    if logging.getLogger().isEnabledFor(logging.INFO):
+        logging.info("   ⚙️  Parameters: %s", clf.get_params() if hasattr(clf, "get_params") else "N/A")
+    
+    # Training phase
+    logging.info("   🏋️  Training %s model...", clf_name)
+    with profile(clf_name, appliance), span("fit", appliance=appliance, model=clf_name, n_train=len(train_idx)) as fit_span:
+        if feature_cache is not None and clf_name in KERNEL_MODELS:
+            # Kernel features are shared across appliances; only the ridge head is trained here
+            with span("features", model=clf_name):
+                features = feature_cache.get(clf_name, clf, X, train_idx)
+            X_train = features[:, train_idx]
+            model = KernelHead().fit(X_train, y_train)
+        else:
+            X_train = as_model_input(clf_name, X, train_idx)
+            model = clf.fit(X_train, y_train)
+    train_time = fit_span.duration
+    logging.info("   ✅ Training completed in %.2f seconds", train_time)
+    with span("threshold", appliance=appliance, model=clf_name):
+        threshold = training_threshold(model, X_train, y_train)
+    del X_train
+    if model_store is not None:
+        # The head predicts from the cached features below; only the saved model needs the transformers
+        saved = model
+        if isinstance(model, KernelHead):
+            saved = KernelPipeline(feature_cache.transformers(clf_name, clf, X, train_idx), model)
+        model_store.save([appliance], clf_name, saved, [threshold])
+    
+    # Prediction phase: labels and scores (probabilities or ridge margins) in one pass
+    logging.info("   🔮 Making predictions on test set...")
+    with span("predict", appliance=appliance, model=clf_name, n_test=len(test_idx)) as predict_span:
+        if feature_cache is not None and clf_name in KERNEL_MODELS:
+            y_pred, y_score = predict_with_scores(model, features[:, test_idx])
+        else:
+            y_pred, y_score = predict_with_scores(clf, as_model_input(clf_name, X, test_idx))
+    predict_time = predict_span.duration
+    logging.info("   ✅ Prediction completed in %.2f seconds", predict_time)
+
+    # Compute metrics
+    logging.info("   📊 Computing performance metrics...")
+    with span("metrics", appliance=appliance, model=clf_name):
+        metrics = compute_metrics(y_test, y_pred, clf_name, y_score, threshold)
+    
+    # Log key metrics prominently (already rounded by compute_metrics)
+    logging.info("   🎯 KEY PERFORMANCE METRICS:")
+    logging.info("      🏆 F1-Score: %s", metrics.get("F1Score", "N/A"))
+    logging.info("      🎯 Accuracy: %s", metrics.get("Accuracy", "N/A"))
+    logging.info("      🔍 Precision: %s", metrics.get("Precision", "N/A"))
+    logging.info("      🔄 Recall: %s", metrics.get("Recall", "N/A"))
+    logging.info("      📈 ROC AUC: %s, PR AUC: %s (%s)", metrics.get("ROC_AUC", "N/A"), metrics.get("PR_AUC", "N/A"),
+                 "hard labels" if y_score is None else "scores")
+    logging.info("      🎚️  Training threshold: %s (test F1-Score %s)", metrics.get("Threshold", "N/A"),
+                 metrics.get("F1ScoreAtThreshold", "N/A"))
+    
+    # Log all metrics in detail
+    logging.info("   📈 COMPLETE METRICS: %s", metrics)
+    logging.info("   ⏱️  Total processing time: %.2f seconds", train_time + predict_time)
+
+    # Store results
+    results_df = pd.DataFrame([metrics])
+    results_df.insert(0, "Model", clf_name)
+    results_df.insert(0, "Appliance", appliance)            
+    
+    logging.info("   ✅ %s evaluation completed successfully!", clf_name)
+    logging.info("-" * 40)
+    return results_df
+
+
+def log_model_failure(clf_name, e):
+    logging.error("   ❌ FAILED: %s model training/evaluation failed!", clf_name)
+    logging.error("   🐛 Error details: %s", e)
+    logging.error("   📍 Error type: %s", type(e).__name__)
+    logging.error("-" * 40)
+
+
+def training_threshold(estimator, X_train, y_train):
+    """
+    F1-optimal operating point(s) on the scores of the training rows (one per column of a
+    2D ``y_train``). The test rows only ever see the threshold, so it is not tuned on them.
+    """
+    y_pred, y_score = predict_with_scores(estimator, X_train)
+    scores = y_pred if y_score is None else y_score
+    if np.ndim(y_train) == 2:
+        scores = np.asarray(scores, dtype=float).reshape(y_train.shape)
+        return [best_threshold(y_train[:, j], scores[:, j]) for j in range(y_train.shape[1])]
+    return best_threshold(y_train, scores)
+
+
+def split_train_test(y, test_size):
+    """Stratified train/test split of row indices; deterministic for a given ``y`` and ``RANDOM_SEED``."""
+    from sklearn.model_selection import train_test_split
+
+    with span("split", n=len(y)):
+        return train_test_split(
+            np.arange(len(y)), test_size=test_size, stratify=y, random_state=RANDOM_SEED)
+
+
+def fit_and_evaluate(appliance, classifiers, X, y, test_size, output_path, feature_cache=None, journal=None):    
     logging.info(f"🤖 TRAINING & EVALUATION FOR APPLIANCE: {appliance.upper()}")
     logging.info("=" * 60)
     
     # Perform train-test split
     logging.info(f"🔀 Performing train-test split (test_size={test_size}, random_state={RANDOM_SEED})")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, stratify=y, random_state=RANDOM_SEED)
+    train_idx, test_idx = split_train_test(y, test_size)
+    y_train, y_test = y[train_idx], y[test_idx]
     
     # Log detailed split information
     train_positive = sum(y_train)
@@ -125,10 +244,10 @@ def fit_and_evaluate(appliance, classifiers, X, y, test_size, output_path):
     test_negative = len(y_test) - test_positive
     
     logging.info(f"📊 DATASET SPLIT SUMMARY:")
-    logging.info(f"   📈 Training set: {X_train.shape[0]} samples, {X_train.shape[1]} features")
+    logging.info(f"   📈 Training set: {len(train_idx)} samples, {X.shape[1]} features")
     logging.info(f"      🟢 Positive samples: {train_positive} ({train_positive/len(y_train)*100:.1f}%)")
     logging.info(f"      🔴 Negative samples: {train_negative} ({train_negative/len(y_train)*100:.1f}%)")
-    logging.info(f"   📉 Test set: {X_test.shape[0]} samples, {X_test.shape[1]} features")
+    logging.info(f"   📉 Test set: {len(test_idx)} samples, {X.shape[1]} features")
     logging.info(f"      🟢 Positive samples: {test_positive} ({test_positive/len(y_test)*100:.1f}%)")
     logging.info(f"      🔴 Negative samples: {test_negative} ({test_negative/len(y_test)*100:.1f}%)")
     
@@ -144,69 +263,79 @@ def fit_and_evaluate(appliance, classifiers, X, y, test_size, output_path):
         for clf_name, clf in classifiers.items():
             model_count += 1
             try:
-                logging.info(f"🚀 MODEL {model_count}/{len(classifiers)}: {clf_name.upper()}")
-                logging.info(f"   📝 Algorithm: {type(clf).__name__}")
-                logging.info(f"   ⚙️  Parameters: {clf.get_params() if hasattr(clf, 'get_params') else 'N/A'}")
-                
-                # Training phase
-                logging.info(f"   🏋️  Training {clf_name} model...")
-                import time
-                start_time = time.time()
-                clf.fit(X_train, y_train)
-                train_time = time.time() - start_time
-                logging.info(f"   ✅ Training completed in {train_time:.2f} seconds")
-                
-                # Prediction phase
-                logging.info(f"   🔮 Making predictions on test set...")
-                start_time = time.time()
-                y_pred = clf.predict(X_test)
-                predict_time = time.time() - start_time
-                logging.info(f"   ✅ Prediction completed in {predict_time:.2f} seconds")
-
-                # Compute metrics
-                logging.info(f"   📊 Computing performance metrics...")
-                metrics = compute_metrics(y_test, y_pred, clf_name)
-                
-                # Log key metrics prominently
-                f1_score = metrics.get('F1Score', 'N/A')
-                accuracy = metrics.get('Accuracy', 'N/A')
-                precision = metrics.get('Precision', 'N/A')
-                recall = metrics.get('Recall', 'N/A')
-                
-                logging.info(f"   🎯 KEY PERFORMANCE METRICS:")
-                logging.info(f"      🏆 F1-Score: {f1_score:.4f}" if f1_score != 'N/A' else f"      🏆 F1-Score: {f1_score}")
-                logging.info(f"      🎯 Accuracy: {accuracy:.4f}" if accuracy != 'N/A' else f"      🎯 Accuracy: {accuracy}")
-                logging.info(f"      🔍 Precision: {precision:.4f}" if precision != 'N/A' else f"      🔍 Precision: {precision}")
-                logging.info(f"      🔄 Recall: {recall:.4f}" if recall != 'N/A' else f"      🔄 Recall: {recall}")
-                
-                # Log all metrics in detail
-                logging.info(f"   📈 COMPLETE METRICS: {metrics}")
-                logging.info(f"   ⏱️  Total processing time: {train_time + predict_time:.2f} seconds")
-
-                # Store results
-                results_df = pd.DataFrame([metrics])
-                results_df.insert(0, "Model", clf_name)
-                results_df.insert(0, "Appliance", appliance)            
+                logging.info("🚀 MODEL %d/%d: %s", model_count, len(classifiers), clf_name.upper())
+                if journal is not None and journal.result(appliance, clf_name) is not None:
+                    logging.info("   ⏭️  Already completed in journal, skipping %s", clf_name)
+                    results_df = journal.result(appliance, clf_name)
+                else:
+                    model_store = journal.model_store if journal is not None else None
+                    results_df = evaluate_model(
+                        appliance, clf_name, clf, X, y, train_idx, test_idx, feature_cache, model_store)
+                    if journal is not None:
+                        journal.record(results_df, journal.model_path(appliance, clf_name))
                 all_results.append(results_df)                
                 
-                logging.info(f"   ✅ {clf_name} evaluation completed successfully!")
-                logging.info("-" * 40)
-                
                 pbar.update(1)
-                pbar.set_postfix({"Model": clf_name, "F1Score": f1_score})
+                pbar.set_postfix({"Model": clf_name, "F1Score": results_df["F1Score"].iloc[0]})
                 
             except Exception as e:
-                logging.error(f"   ❌ FAILED: {clf_name} model training/evaluation failed!")
-                logging.error(f"   🐛 Error details: {str(e)}")
-                logging.error(f"   📍 Error type: {type(e).__name__}")
-                logging.error("-" * 40)
+                log_model_failure(clf_name, e)
                 continue
             
 
+    return save_appliance_results(appliance, all_results, output_path)
+
+
+def fit_and_evaluate_halving(appliance, classifiers, X, y, test_size, output_path, time_budget, eta=3,
+                             feature_cache=None, journal=None):
+    """
+    Budgeted variant of ``fit_and_evaluate``: successive halving picks the models worth a full fit.
+
+    Only the models that survive the search (see ``halving.successive_halving``) are trained
+    on the full training split and scored on the test split; the ranking of every rung is
+    written to ``{appliance}_halving.csv``. An appliance with results in the journal is not
+    searched again.
+    """
+    logging.info(f"🤖 BUDGETED TRAINING & EVALUATION FOR APPLIANCE: {appliance.upper()}")
+    logging.info(f"   ⏱️  Time budget: {time_budget:.0f} seconds, reduction factor: {eta}")
+    logging.info("=" * 60)
+
+    if journal is not None:
+        done = [journal.result(appliance, clf_name) for clf_name in classifiers]
+        done = [results_df for results_df in done if results_df is not None]
+        if done:
+            logging.info(f"   ⏭️  Already completed in journal, skipping the search for {appliance}")
+            return save_appliance_results(appliance, done, output_path)
+
+    train_idx, test_idx = split_train_test(y, test_size)
+    model_store = journal.model_store if journal is not None else None
+
+    def evaluate(clf_name, clf):
+        logging.info("🚀 FINAL FIT: %s", clf_name.upper())
+        try:
+            results_df = evaluate_model(
+                appliance, clf_name, clf, X, y, train_idx, test_idx, feature_cache, model_store)
+        except Exception as e:
+            log_model_failure(clf_name, e)
+            return None
+        if journal is not None:
+            journal.record(results_df, journal.model_path(appliance, clf_name))
+        return results_df
+
+    with span("halving", appliance=appliance, n_models=len(classifiers), budget=time_budget):
+        results, rung_table = successive_halving(
+            appliance, classifiers, X, y, train_idx, time_budget, evaluate, eta, random_state=RANDOM_SEED)
+
+    os.makedirs(output_path, exist_ok=True)
+    rung_table.to_csv(os.path.join(output_path, f"{appliance}_halving.csv"), index=False)
+    return save_appliance_results(appliance, [df for df in results if df is not None], output_path)
+
+
+def save_appliance_results(appliance, all_results, output_path):
     # Save results
     if all_results:
         os.makedirs(output_path, exist_ok=True)
-        result_df = pd.concat(all_results)
+        result_df = pd.concat(all_results, ignore_index=True)
         result_path = os.path.join(output_path, f"{appliance}.csv")
         result_df.round(6).to_csv(result_path, index=False)
         
@@ -217,14 +346,22 @@ def fit_and_evaluate(appliance, classifiers, X, y, test_size, output_path):
         logging.info(f"📈 Results summary:")
         
         # Create a summary of best performing models
-        best_f1 = result_df.loc[result_df['F1Score'].idxmax()]
-        best_accuracy = result_df.loc[result_df['Accuracy'].idxmax()]
-        
-        logging.info(f"   🏆 Best F1-Score: {best_f1['F1Score']:.4f} ({best_f1['Model']})")
-        logging.info(f"   🎯 Best Accuracy: {best_accuracy['Accuracy']:.4f} ({best_accuracy['Model']})")
+        if "F1Score" in result_df.columns:
+            best_f1 = result_df.loc[result_df['F1Score'].idxmax()]
+            best_accuracy = result_df.loc[result_df['Accuracy'].idxmax()]
+
+            logging.info(f"   🏆 Best F1-Score: {best_f1['F1Score']:.4f} ({best_f1['Model']})")
+            logging.info(f"   🎯 Best Accuracy: {best_accuracy['Accuracy']:.4f} ({best_accuracy['Model']})")
+        else:
+            best_mae = result_df.loc[result_df['MAE'].idxmin()]
+            best_exact = result_df.loc[result_df['ExactMatch'].idxmax()]
+
+            logging.info(f"   🏆 Best MAE: {best_mae['MAE']:.4f} ({best_mae['Model']})")
+            logging.info(f"   🎯 Best exact-match rate: {best_exact['ExactMatch']:.4f} ({best_exact['Model']})")
         
-        logging.info("📋 DETAILED RESULTS TABLE:")
-        logging.info("\n" + result_df.to_string(index=False))
+        # The full table is only rendered when it is actually logged
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("📋 DETAILED RESULTS TABLE:\n%s", result_df.to_string(index=False))
         logging.info("=" * 60)
         return result_df
     else:
@@ -232,7 +369,360 @@ def fit_and_evaluate(appliance, classifiers, X, y, test_size, output_path):
         return None
 
 
-def run_experiment(config_path):
+def load_label_matrix(appliance_list, label_file, cache_dir=None):
+    """
+    Load the labels of all requested appliances as one (buildings, appliances) matrix.
+    """
+    logging.info(f"🏷️  Loading label matrix for {len(appliance_list)} appliances from: {label_file}")
+    labels = open_labels(label_file, cache_dir)
+
+    missing = [appliance for appliance in appliance_list if appliance not in labels.columns]
+    if missing:
+        logging.error(f"❌ CRITICAL ERROR: Appliances {missing} not found in label file!")
+        logging.error(f"Available columns: {labels.columns}")
+        print(f"Error: appliances {missing} not found in label file. See log for details.")
+        exit(1)
+
+    Y = np.asarray(labels.Y[:, [labels.columns.index(appliance) for appliance in appliance_list]])
+    for appliance, positive_samples in zip(appliance_list, (Y > 0).sum(axis=0)):
+        logging.info(f"   🟢 {appliance}: {positive_samples}/{len(Y)} buildings ({positive_samples / len(Y) * 100:.1f}%)")
+    return Y
+
+
+def evaluate_model_multilabel(appliance_list, clf_name, clf, X, Y, train_idx, test_idx, feature_cache=None,
+                              model_store=None):
+    """
+    Train one model for all appliances at once and return one result frame per appliance.
+
+    The fitted model (one estimator per appliance for the per-appliance fallback) is
+    saved to ``model_store`` when one is given.
+    """
+    Y_train, Y_test = Y[train_idx], Y[test_idx]
+    score_type = None
+    with profile(clf_name, "multilabel"), span("fit_predict", model=clf_name, n_appliances=len(appliance_list)) as total:
+        if feature_cache is not None and clf_name in KERNEL_MODELS:
+            with span("features", model=clf_name):
+                features = feature_cache.get(clf_name, clf, X, train_idx)
+            F_train = features[:, train_idx]
+            with span("fit", model=clf_name, n_train=len(train_idx)):
+                model = KernelHead().fit(F_train, Y_train)
+            thresholds = training_threshold(model, F_train, Y_train)
+            del F_train
+            with span("predict", model=clf_name, n_test=len(test_idx)):
+                Y_pred, Y_score = predict_with_scores(model, features[:, test_idx])
+        elif hasattr(clf, "get_tag") and clf.get_tag("capability:multioutput", False):
+            X_train = as_model_input(clf_name, X, train_idx)
+            with span("fit", model=clf_name, n_train=len(train_idx)):
+                model = clf.fit(X_train, Y_train)
+            # Multi-output sktime estimators are scored by their hard predictions, as below
+            Y_fit = np.asarray(model.predict(X_train))
+            score_type = "label"
+            thresholds = [best_threshold(Y_train[:, j], Y_fit[:, j]) for j in range(len(appliance_list))]
+            del X_train
+            with span("predict", model=clf_name, n_test=len(test_idx)):
+                Y_pred, Y_score = np.asarray(model.predict(as_model_input(clf_name, X, test_idx))), None
+        else:
+            # One copy of the split serves the fits of every appliance
+            X_train, X_test = as_model_input(clf_name, X, train_idx), as_model_input(clf_name, X, test_idx)
+            estimators, predictions, scores, thresholds = [], [], [], []
+            for j, appliance in enumerate(appliance_list):
+                with span("fit", appliance=appliance, model=clf_name, n_train=len(train_idx)):
+                    clf.fit(X_train, Y_train[:, j])
+                thresholds.append(training_threshold(clf, X_train, Y_train[:, j]))
+                with span("predict", appliance=appliance, model=clf_name, n_test=len(test_idx)):
+                    y_pred, y_score = predict_with_scores(clf, X_test)
+                predictions.append(y_pred)
+                scores.append(y_score)
+                if model_store is not None:
+                    estimators.append(copy.deepcopy(clf))
+            model = PerApplianceModel(estimators)
+            score_type = infer_score_type(clf)
+            Y_pred = np.column_stack(predictions)
+            Y_score = None if any(score is None for score in scores) else np.column_stack(scores)
+    logging.info("   ✅ Training and prediction completed in %.2f seconds", total.duration)
+    if model_store is not None:
+        if isinstance(model, KernelHead):
+            model = KernelPipeline(feature_cache.transformers(clf_name, clf, X, train_idx), model)
+        model_store.save(appliance_list, clf_name, model, thresholds, score_type)
+
+    all_results = []
+    for j, appliance in enumerate(appliance_list):
+        with span("metrics", appliance=appliance, model=clf_name):
+            metrics = compute_metrics(Y_test[:, j], Y_pred[:, j], clf_name, None if Y_score is None else Y_score[:, j],
+                                      thresholds[j])
+        logging.info("   🏆 %s: F1-Score %s", appliance, metrics.get("F1Score", "N/A"))
+        results_df = pd.DataFrame([metrics])
+        results_df.insert(0, "Model", clf_name)
+        results_df.insert(0, "Appliance", appliance)
+        all_results.append(results_df)
+    return all_results
+
+
+def evaluate_counting(appliance_list, reg_name, reg, X, Y, train_idx, test_idx, feature_cache=None,
+                      model_store=None):
+    """
+    Train one regressor for the appliance counts and score all appliances in one batched metrics pass.
+
+    Follows ``evaluate_model_multilabel``: kernel models fit a multi-output ridge regression
+    on the shared kernel features, multi-output sktime regressors are fitted once, and the
+    others once per appliance.
+    """
+    Y_train, Y_test = Y[train_idx], Y[test_idx]
+    with profile(reg_name, "counting"), span("fit_predict", model=reg_name, n_appliances=len(appliance_list)) as total:
+        if feature_cache is not None and reg_name in KERNEL_MODELS:
+            with span("features", model=reg_name):
+                features = feature_cache.get(reg_name, reg, X, train_idx)
+            with span("fit", model=reg_name, n_train=len(train_idx)):
+                model = KernelRegressionHead().fit(features[:, train_idx], Y_train)
+            with span("predict", model=reg_name, n_test=len(test_idx)):
+                Y_pred = model.predict(features[:, test_idx])
+        elif hasattr(reg, "get_tag") and reg.get_tag("capability:multioutput", False):
+            with span("fit", model=reg_name, n_train=len(train_idx)):
+                model = reg.fit(as_model_input(reg_name, X, train_idx), Y_train)
+            with span("predict", model=reg_name, n_test=len(test_idx)):
+                Y_pred = np.asarray(model.predict(as_model_input(reg_name, X, test_idx)))
+        else:
+            X_train, X_test = as_model_input(reg_name, X, train_idx), as_model_input(reg_name, X, test_idx)
+            estimators, predictions = [], []
+            for j, appliance in enumerate(appliance_list):
+                with span("fit", appliance=appliance, model=reg_name, n_train=len(train_idx)):
+                    reg.fit(X_train, Y_train[:, j])
+                with span("predict", appliance=appliance, model=reg_name, n_test=len(test_idx)):
+                    predictions.append(reg.predict(X_test))
+                if model_store is not None:
+                    estimators.append(copy.deepcopy(reg))
+            model = PerApplianceModel(estimators)
+            Y_pred = np.column_stack(predictions)
+    logging.info("   ✅ Training and prediction completed in %.2f seconds", total.duration)
+    if model_store is not None:
+        if isinstance(model, KernelRegressionHead):
+            model = KernelPipeline(feature_cache.transformers(reg_name, reg, X, train_idx), model)
+        model_store.save(appliance_list, reg_name, model)
+
+    with span("metrics", model=reg_name, n_appliances=len(appliance_list)):
+        metrics = pd.DataFrame(compute_count_metrics(Y_test, Y_pred))
+    metrics.insert(0, "Model", reg_name)
+    metrics.insert(0, "Appliance", appliance_list)
+    for appliance, mae in zip(appliance_list, metrics["MAE"]):
+        logging.info("   🏆 %s: MAE %.4f", appliance, mae)
+    return [metrics.iloc[[j]].reset_index(drop=True) for j in range(len(appliance_list))]
+
+
+def fit_and_evaluate_multilabel(appliance_list, classifiers, X, Y, test_size, output_path, feature_cache=None,
+                                journal=None, evaluate=evaluate_model_multilabel):
+    """
+    Train every model once for all appliances on a single iteratively stratified split.
+
+    Kernel models fit one multi-output ridge head on the shared kernel features, sktime
+    estimators tagged ``capability:multioutput`` are fitted once on the full label matrix,
+    and the remaining estimators fall back to one fit per appliance on the same split.
+    Results are written per appliance in the same format as ``fit_and_evaluate``.
+    The counting task runs through here too, with ``evaluate=evaluate_counting``; its
+    split is stratified on appliance presence (count > 0).
+    """
+    logging.info(f"🤖 MULTI-LABEL TRAINING & EVALUATION FOR {len(appliance_list)} APPLIANCES")
+    logging.info("=" * 60)
+
+    logging.info(f"🔀 Performing iterative stratified split over all appliances (test_size={test_size}, random_state={RANDOM_SEED})")
+    with span("split", n=len(Y)):
+        train_idx, test_idx = iterative_train_test_split(Y, test_size, random_state=RANDOM_SEED)
+    logging.info(f"   📈 Training set: {len(train_idx)} samples, 📉 Test set: {len(test_idx)} samples")
+
+    results = {appliance: [] for appliance in appliance_list}
+
+    tqdm.write(f"🎯 Evaluating {len(classifiers)} models for {len(appliance_list)} appliances")
+    with tqdm(total=len(classifiers), mininterval=0, miniters=1, desc="Models") as pbar:
+        for clf_name, clf in classifiers.items():
+            try:
+                logging.info("🚀 MODEL: %s (%s)", clf_name.upper(), type(clf).__name__)
+                if journal is not None and journal.is_done(appliance_list, clf_name):
+                    logging.info("   ⏭️  Already completed in journal, skipping %s", clf_name)
+                    model_results = [journal.result(appliance, clf_name) for appliance in appliance_list]
+                else:
+                    model_store = journal.model_store if journal is not None else None
+                    model_results = evaluate(
+                        appliance_list, clf_name, clf, X, Y, train_idx, test_idx, feature_cache, model_store)
+                    if journal is not None:
+                        journal.record(pd.concat(model_results, ignore_index=True), journal.model_path(None, clf_name))
+                for appliance, results_df in zip(appliance_list, model_results):
+                    results[appliance].append(results_df)
+
+                pbar.update(1)
+                pbar.set_postfix({"Model": clf_name})
+
+            except Exception as e:
+                log_model_failure(clf_name, e)
+                continue
+
+    return [save_appliance_results(appliance, results[appliance], output_path) for appliance in appliance_list]
+
+
+def run_job(job, context):
+    """
+    Scheduler worker: run one job of the experiment graph in a child process.
+
+    Data is re-opened from the memory-mapped cache (no CSV parsing, no pickling of ``X``)
+    and the classifier is rebuilt locally with the job's core budget. A job with a ``fold``
+    evaluates that shared cross-validation split; its rows carry a ``Fold`` column and the
+    per-fold model is not saved.
+    """
+    configure_instrumentation(context["trace_file"], context["profile_model"], context["profile_dir"])
+    with span("job", kind=job.kind, appliance=job.appliance, model=job.model, fold=job.fold, cores=job.cores):
+        return _run_job(job, context)
+
+
+def _run_job(job, context):
+    X = load_series(context["data_file"], context["data_limit"], context["cache_dir"], context["resolution"],
+                    context["dtype"])
+    clf = apply_core_budget(select_classifiers([job.model])[job.model], job.cores)
+    if context["windowing"] is not None:
+        clf = WindowedClassifier(clf, **context["windowing"])
+    feature_cache = None
+    if context["feature_dir"] is not None:
+        feature_cache = FeatureCache(context["dataset_key"], context["feature_dir"], RANDOM_SEED)
+
+    if job.kind == "features":
+        feature_cache.get(job.model, clf, X, None)
+        return []
+
+    fold_info = "" if job.fold is None else f" fold {job.fold + 1}/{len(context['folds'])}"
+    logging.info("🚀 JOB %s/%s%s on %d core(s)", job.model, job.appliance or "all appliances", fold_info, job.cores)
+    model_store = context["model_store"] if job.fold is None else None
+    if job.appliance is None:
+        with span("load", n_appliances=len(context["appliance_list"])):
+            Y = load_label_matrix(context["appliance_list"], context["label_file"], context["cache_dir"])
+        if job.fold is None:
+            with span("split", n=len(Y)):
+                train_idx, test_idx = iterative_train_test_split(Y, context["test_size"], random_state=RANDOM_SEED)
+        else:
+            train_idx, test_idx = context["folds"][job.fold]
+        results = evaluate_model_multilabel(
+            context["appliance_list"], job.model, clf, X, Y, train_idx, test_idx, feature_cache, model_store)
+    else:
+        with span("load", appliance=job.appliance):
+            _, y = load_data(job.appliance, context["data_file"], context["label_file"], context["data_limit"],
+                             context["cache_dir"], context["resolution"])
+        if job.fold is None:
+            train_idx, test_idx = split_train_test(y, context["test_size"])
+        else:
+            train_idx, test_idx = context["folds"][job.fold]
+        results = [evaluate_model(job.appliance, job.model, clf, X, y, train_idx, test_idx, feature_cache,
+                                  model_store)]
+
+    if job.fold is not None:
+        for results_df in results:
+            results_df.insert(2, "Fold", job.fold)
+    return results
+
+
+def run_scheduled(appliance_list, classifiers, context, max_cores, output_path, journal=None):
+    """
+    Run all (appliance, model) jobs on a process pool and stream results into the per-appliance CSVs.
+
+    Jobs already recorded in ``journal`` are not scheduled again; every finished job is
+    journaled from this process as soon as its result arrives. With cross-validation
+    (``context["folds"]``), per-fold rows are kept in ``{appliance}_folds.csv`` and an
+    (appliance, model) result is summarised and journaled once all of its folds are in.
+    """
+    folds = context["folds"]
+    shared_feature_models = []
+    if context["feature_dir"] is not None and not context["multilabel"]:
+        shared_feature_models = [name for name in KERNEL_MODELS
+                                 if name in classifiers and transform_is_data_independent(classifiers[name])]
+    jobs = plan_jobs([None] if context["multilabel"] else appliance_list, list(classifiers),
+                     max_cores, MODEL_COST, shared_feature_models, len(folds) if folds else None)
+
+    results = {appliance: [] for appliance in appliance_list}
+    if journal is not None:
+        def is_done(job):
+            appliances = appliance_list if job.appliance is None else [job.appliance]
+            return job.kind == "fit" and journal.is_done(appliances, job.model)
+
+        # Every fold job of a finished (appliance, model) is done; its result is taken once
+        resumed = set()
+        for job in filter(is_done, jobs):
+            for appliance in (appliance_list if job.appliance is None else [job.appliance]):
+                if (appliance, job.model) not in resumed:
+                    resumed.add((appliance, job.model))
+                    results[appliance].append(journal.result(appliance, job.model))
+        remaining = [job for job in jobs if not is_done(job)]
+        # Shared feature jobs are only needed while one of their fit jobs is left
+        needed = {dep for job in remaining for dep in job.after}
+        jobs = [job for job in remaining if job.kind == "fit" or job_key(job) in needed]
+        logging.info(f"⏭️  Resuming: {sum(len(r) for r in results.values())} results already in the journal")
+
+    logging.info(f"🗂️  SCHEDULING {len(jobs)} JOBS ON {max_cores} CORES")
+    for job in jobs:
+        fold_info = "" if job.fold is None else f" fold={job.fold}"
+        logging.info("   • %-8s %-25s %-20s cores=%d%s", job.kind, job.model, job.appliance or "*", job.cores, fold_info)
+
+    os.makedirs(output_path, exist_ok=True)
+    fold_results = {}
+    if folds and journal is not None:
+        # Fold rows of pairs finished before a resume are kept; unfinished pairs rerun all their folds
+        for appliance in appliance_list:
+            fold_path = os.path.join(output_path, f"{appliance}_folds.csv")
+            if os.path.exists(fold_path):
+                rows = pd.read_csv(fold_path)
+                rows = rows[[journal.result(appliance, model) is not None for model in rows["Model"]]]
+                if len(rows):
+                    fold_results[appliance] = [rows]
+
+    with tqdm(total=len(jobs), mininterval=0, miniters=1, desc="Jobs") as pbar:
+        def on_result(job, job_results):
+            if job.fold is not None and job_results:
+                job_results = collect_fold(job, job_results)
+            if journal is not None and job_results:
+                journal.record(pd.concat(job_results, ignore_index=True),
+                               journal.model_path(job.appliance, job.model))
+            for results_df in job_results:
+                appliance = results_df["Appliance"].iloc[0]
+                results[appliance].append(results_df)
+                pd.concat(results[appliance], ignore_index=True).round(6).to_csv(
+                    os.path.join(output_path, f"{appliance}.csv"), index=False)
+            pbar.update(1)
+            pbar.set_postfix({"Model": job.model, "appliance": job.appliance})
+
+        def collect_fold(job, job_results):
+            # Keep the fold rows; return the summaries of (appliance, model) pairs whose folds are all done
+            summaries = []
+            for results_df in job_results:
+                appliance = results_df["Appliance"].iloc[0]
+                fold_results.setdefault(appliance, []).append(results_df)
+                rows = pd.concat(fold_results[appliance], ignore_index=True).sort_values(["Model", "Fold"])
+                rows.round(6).to_csv(os.path.join(output_path, f"{appliance}_folds.csv"), index=False)
+                rows = rows[rows["Model"] == job.model]
+                if len(rows) == len(folds):
+                    summary = summarize_folds(rows)
+                    logging.info("   📊 %s/%s: F1-Score %.4f ± %.4f over %d folds", appliance, job.model,
+                                 summary["F1Score"].iloc[0], summary["F1Score_std"].iloc[0], len(folds))
+                    summaries.append(summary)
+            return summaries
+
+        run_jobs(jobs, run_job, context, max_cores, on_result)
+
+    # Restore config model order before the final write and summary
+    model_order = {name: i for i, name in enumerate(classifiers)}
+    return [save_appliance_results(
+                appliance, sorted(results[appliance], key=lambda df: model_order[df["Model"].iloc[0]]), output_path)
+            for appliance in appliance_list]
+
+
+def expand_resolutions(config):
+    """
+    Split a config with a list of resolutions into one config per resolution.
+
+    Each gets the experiment name ``{experiment_name}_{resolution}min``; a config with a
+    single resolution is returned as the only entry.
+    """
+    resolutions = config.get("resolution")
+    if not isinstance(resolutions, list):
+        return [config]
+    return [dict(config, resolution=resolution, experiment_name=f"{config['experiment_name']}_{resolution}min")
+            for resolution in resolutions]
+
+
+def run_experiment(config_path, resume=False, trace_file=None, profile_model=None):
     # Load configuration
     logging.info("🔧 LOADING EXPERIMENT CONFIGURATION")
     logging.info("=" * 80)
@@ -240,19 +730,86 @@ def run_experiment(config_path):
     with open(config_path, "r") as f:
         config = yaml.safe_load(f)
 
+    # A list of resolutions is a sweep: one experiment per resolution, all derived from the
+    # same cached base series, so the CSV is parsed once for the whole sweep
+    configs = expand_resolutions(config)
+    if len(configs) == 1:
+        return run_config(config, resume, trace_file, profile_model)
+    for resolution_config in configs:
+        # Every experiment of the sweep gets its own trace
+        resolution_trace = None
+        if trace_file is not None:
+            root, ext = os.path.splitext(trace_file)
+            resolution_trace = f"{root}_{resolution_config['resolution']}min{ext}"
+        run_config(resolution_config, resume, resolution_trace, profile_model)
+
+
+def run_config(config, resume=False, trace_file=None, profile_model=None):
+    """
+    Run one experiment config.
+
+    Parameters:
+        config (dict): Parsed YAML config with a single resolution.
+        resume (bool): Skip jobs already recorded in the journal.
+        trace_file (str, optional): Write load/split/fit/predict/metrics spans here
+            (``.jsonl`` for JSON lines, otherwise Chrome trace events).
+        profile_model (str, optional): Model whose fits run under cProfile.
+    """
     experiment_name = config["experiment_name"]
     data_file = config["data_file"]
     label_file = config["label_file"]
-    data_limit = config.get("data_limit", 672)
+    cache_dir = config.get("cache_dir")
+    resolution = config.get("resolution")
+    feature_cache_mode = check_feature_cache(config.get("feature_cache", "off"))
+    task = config.get("task", "detection")
+    multilabel = config.get("multilabel", False)
+    max_cores = resolve_n_jobs(config.get("n_jobs", 1))
     test_size = config.get("test_size", 0.3)
+    cv_folds = config.get("cv_folds", 1)
+    cv_repeats = config.get("cv_repeats", 1)
+    window_stride = config.get("window_stride")
+    window_aggregation = config.get("window_aggregation", "vote")
+    max_windows = config.get("max_windows", DEFAULT_MAX_WINDOWS)
+    dtype = config.get("dtype", "float32")
+    if dtype not in ("float32", "float64"):
+        raise ValueError(f"dtype must be float32 or float64, got {dtype!r}")
+    time_budget = config.get("time_budget")
+    halving_eta = config.get("halving_eta", 3)
     results_dir = config["results_dir"]
     appliance_list = config["appliance_list"]
     model_names = config["models"]
+    save_models = config.get("save_models", False)
 
     output_path = os.path.join(results_dir, experiment_name)
     log_path = os.path.join(results_dir, f"{experiment_name}_log.txt")
+    journal_path = os.path.join(results_dir, f"{experiment_name}_journal.jsonl")
+    model_dir = os.path.join(results_dir, f"{experiment_name}_models")
+    profile_dir = os.path.join(results_dir, f"{experiment_name}_profiles")
+
+    setup_logging(log_path, resume)
+    if trace_file is not None:
+        start_trace(trace_file, append=resume)
+    configure_instrumentation(trace_file, profile_model, profile_dir)
+
+    # data_limit counts points of the CSV; at a coarser resolution the same span has fewer points
+    store = open_series(data_file, cache_dir)
+    labels = open_labels(label_file, cache_dir)
+    # Labels are matched to buildings by position, so their ids must follow the data columns
+    check_label_ids(store.buildings, labels.ids)
+    base_resolution = series_resolution(store.timestamps)
+    factor = resample_factor(base_resolution, resolution)
+    data_limit = config.get("data_limit", 672) // factor
+    resolution = resolution or base_resolution
 
-    setup_logging(log_path)
+    # Windowed training reads whole series and cuts data_limit-long windows out of them
+    windowing = None
+    if window_stride is not None and time_budget is not None:
+        logging.warning("⚠️  window_stride is ignored with time_budget: halving rungs cut their own windows")
+    elif window_stride is not None:
+        windowing = {"window": data_limit, "stride": max(1, window_stride // factor),
+                     "aggregation": window_aggregation, "max_windows": max_windows}
+        feature_cache_mode = "off"
+    series_limit = None if windowing else data_limit
     
     # Log experiment configuration
     logging.info(f"🧪 EXPERIMENT CONFIGURATION LOADED")
@@ -260,18 +817,38 @@ def run_experiment(config_path):
     logging.info(f"   📂 Data file: {data_file}")
     logging.info(f"   🏷️  Label file: {label_file}")
     logging.info(f"   ⏱️  Data limit (time points): {data_limit}")
-    logging.info(f"   📊 Test set size: {test_size * 100:.1f}%")
+    logging.info(f"   🕒 Resolution: {resolution} min (data file: {base_resolution} min)")
+    logging.info(f"   🔢 Series dtype: {dtype}")
+    if windowing is not None:
+        logging.info(f"   🪟 Windows: {data_limit} points every {windowing['stride']} points over the full series "
+                     f"(max {max_windows or 'all'} per building), aggregated by {window_aggregation}")
+    if cv_folds > 1:
+        logging.info(f"   📊 Cross-validation: {cv_folds} folds × {cv_repeats} repeat(s)")
+    else:
+        logging.info(f"   📊 Test set size: {test_size * 100:.1f}%")
     logging.info(f"   📁 Results directory: {results_dir}")
     logging.info(f"   📁 Output path: {output_path}")
     logging.info(f"   📋 Appliances to evaluate: {appliance_list} (Total: {len(appliance_list)})")
     logging.info(f"   🤖 Models to test: {model_names} (Total: {len(model_names)})")
     logging.info(f"   🎲 Random seed: {RANDOM_SEED}")
+    logging.info(f"   🧮 Kernel feature cache: {feature_cache_mode}")
+    logging.info(f"   🎯 Task: {task}")
+    logging.info(f"   🏷️  Multi-label mode: {multilabel}")
+    logging.info(f"   🖥️  Cores for parallel jobs: {max_cores}")
+    if time_budget is not None:
+        logging.info(f"   ⏱️  Time budget per appliance: {time_budget} seconds (successive halving, eta={halving_eta})")
+    logging.info(f"   📒 Journal: {journal_path} (resume={resume}, save_models={save_models})")
     logging.info("=" * 80)
     
     # Initialize classifiers
     logging.info("🤖 INITIALIZING MACHINE LEARNING MODELS")
     logging.info("-" * 50)
-    classifiers = select_classifiers(model_names)
+    if task == "counting":
+        classifiers = select_regressors(model_names)
+    else:
+        classifiers = select_classifiers(model_names)
+    if windowing is not None:
+        classifiers = {name: WindowedClassifier(clf, **windowing) for name, clf in classifiers.items()}
     logging.info(f"✅ Successfully initialized {len(classifiers)} models:")
     for i, model_name in enumerate(classifiers.keys(), 1):
         logging.info(f"   {i:2d}. {model_name}")
@@ -284,37 +861,137 @@ def run_experiment(config_path):
     logging.info(f"🎯 Total experiment scope: {len(appliance_list)} appliances × {len(classifiers)} models = {len(appliance_list) * len(classifiers)} model evaluations")
     logging.info("=" * 80)
 
+    # Kernel features (Rocket/Minirocket/Arsenal) are computed once and shared by all appliances
+    feature_cache = None
+    if feature_cache_mode != "off":
+        feature_dir = None
+        # Worker processes cannot share an in-memory cache, so parallel runs go through disk
+        if feature_cache_mode == "disk" or max_cores > 1 or cv_folds > 1:
+            feature_dir = os.path.join(cache_path_for(data_file, cache_dir), "features")
+        feature_cache = FeatureCache(f"{store.digest}|{resolution}|{data_limit}", feature_dir, RANDOM_SEED)
+
+    # Fitted models are saved with what is needed to score new meters the same way
+    model_store = None
+    if save_models and cv_folds > 1:
+        logging.warning("⚠️  save_models is ignored with cross-validation: there is one model per fold")
+    elif save_models:
+        model_store = ModelStore(model_dir, {
+            "experiment_name": experiment_name,
+            "data_limit": data_limit,
+            "resolution": resolution,
+            "windowed": windowing is not None,
+            "task": task,
+            "dataset_digest": store.digest,
+            "config": config,
+        })
+
+    # Every finished (appliance, model) result is journaled; --resume skips what is already there
+    journal = Journal(
+        journal_path,
+        config_hash(config, store.digest, labels.digest),
+        resume=resume,
+        model_store=model_store,
+    )
+
     all_appliance_results = []
     appliance_count = 0
     
-    tqdm.write(f"🎯 Starting experiment '{experiment_name}' with {len(appliance_list)} appliances")           
-    with tqdm(total=len(appliance_list), mininterval=0, miniters=1, desc="Appliances") as pbar:
-        for appliance in appliance_list:
-            appliance_count += 1
-            logging.info(f"🔄 PROCESSING APPLIANCE {appliance_count}/{len(appliance_list)}: {appliance.upper()}")
-            logging.info("=" * 80)
-            
-            # Load data for current appliance
-            start_time = pd.Timestamp.now()
-            X, y = load_data(appliance, data_file, label_file, data_limit)
-            data_load_time = (pd.Timestamp.now() - start_time).total_seconds()
-            logging.info(f"⏱️  Data loading completed in {data_load_time:.2f} seconds")
+    if task == "counting" and (time_budget is not None or max_cores > 1 or cv_folds > 1):
+        logging.warning("⚠️  counting runs on a single split: n_jobs, cv_folds and time_budget are ignored")
+    elif time_budget is not None and (max_cores > 1 or cv_folds > 1 or multilabel):
+        logging.warning("⚠️  time_budget runs appliances one by one: n_jobs, cv_folds and multilabel are ignored")
+
+    if task == "counting":
+        # All appliance counts are regressed on one split stratified on appliance presence
+        with span("load", n_appliances=len(appliance_list)) as load_span:
+            X = load_series(data_file, series_limit, cache_dir, resolution, dtype)
+            Y = load_label_matrix(appliance_list, label_file, cache_dir)
+        logging.info("⏱️  Data loading completed in %.2f seconds", load_span.duration)
+
+        results = fit_and_evaluate_multilabel(
+            appliance_list, classifiers, X, Y, test_size, output_path, feature_cache, journal,
+            evaluate=evaluate_counting)
+        all_appliance_results = [result for result in results if result is not None]
+    elif time_budget is None and (max_cores > 1 or cv_folds > 1):
+        # Build the binary caches once here so worker processes only ever read them
+        open_series(data_file, cache_dir, resolution)
+        open_labels(label_file, cache_dir)
+
+        # Cross-validation splits are computed once, stratified over every appliance,
+        # and shared by all (appliance, model) jobs
+        folds = None
+        if cv_folds > 1:
+            Y = load_label_matrix(appliance_list, label_file, cache_dir)
+            with span("split", n=len(Y), folds=cv_folds, repeats=cv_repeats):
+                folds = cross_validation_folds(Y, cv_folds, cv_repeats, random_state=RANDOM_SEED)
+            logging.info(f"🔀 {len(folds)} cross-validation splits, test folds of ~{len(Y) // cv_folds} buildings")
+        context = {
+            "data_file": data_file,
+            "label_file": label_file,
+            "data_limit": series_limit,
+            "windowing": windowing,
+            "dtype": dtype,
+            "cache_dir": cache_dir,
+            "resolution": resolution,
+            "test_size": test_size,
+            "multilabel": multilabel,
+            "appliance_list": appliance_list,
+            "dataset_key": feature_cache.dataset_key if feature_cache else None,
+            "feature_dir": feature_cache.cache_dir if feature_cache else None,
+            "model_store": model_store,
+            "folds": folds,
+            "trace_file": trace_file,
+            "profile_model": profile_model,
+            "profile_dir": profile_dir,
+        }
+        results = run_scheduled(appliance_list, classifiers, context, max_cores, output_path, journal)
+        all_appliance_results = [result for result in results if result is not None]
+    elif time_budget is None and multilabel:
+        # Load X and the full label matrix once; every model is trained once for all appliances
+        with span("load", n_appliances=len(appliance_list)) as load_span:
+            X = load_series(data_file, series_limit, cache_dir, resolution, dtype)
+            Y = load_label_matrix(appliance_list, label_file, cache_dir)
+        logging.info("⏱️  Data loading completed in %.2f seconds", load_span.duration)
+
+        results = fit_and_evaluate_multilabel(
+            appliance_list, classifiers, X, Y, test_size, output_path, feature_cache, journal)
+        all_appliance_results = [result for result in results if result is not None]
+    else:
+        tqdm.write(f"🎯 Starting experiment '{experiment_name}' with {len(appliance_list)} appliances")           
+        with tqdm(total=len(appliance_list), mininterval=0, miniters=1, desc="Appliances") as pbar:
+            # One series matrix and one label matrix serve every appliance
+            with span("load", n_appliances=len(appliance_list)) as load_span:
+                X = load_series(data_file, series_limit, cache_dir, resolution, dtype)
+                Y = load_label_matrix(appliance_list, label_file, cache_dir)
+            logging.info(f"✅ Loaded data shape: {X.shape} (buildings={X.shape[0]}, time points={X.shape[1]})")
+            logging.info("⏱️  Data loading completed in %.2f seconds", load_span.duration)
+
+            for j, appliance in enumerate(appliance_list):
+                appliance_count += 1
+                logging.info(f"🔄 PROCESSING APPLIANCE {appliance_count}/{len(appliance_list)}: {appliance.upper()}")
+                logging.info("=" * 80)
+                y = Y[:, j]
             
-            # Train and evaluate models
-            start_time = pd.Timestamp.now()
-            results_appliance = fit_and_evaluate(appliance, classifiers, X, y, test_size, output_path)
-            if results_appliance is not None:
-                all_appliance_results.append(results_appliance)
-                eval_time = (pd.Timestamp.now() - start_time).total_seconds()
-                logging.info(f"✅ APPLIANCE {appliance.upper()} COMPLETED SUCCESSFULLY")
-                logging.info(f"⏱️  Total evaluation time: {eval_time:.2f} seconds")
-            else:
-                logging.warning(f"⚠️  APPLIANCE {appliance.upper()} FAILED - No successful model results")
+                # Train and evaluate models
+                with span("appliance", appliance=appliance, n_models=len(classifiers)) as eval_span:
+                    if time_budget is not None:
+                        results_appliance = fit_and_evaluate_halving(
+                            appliance, classifiers, X, y, test_size, output_path, time_budget, halving_eta,
+                            feature_cache, journal)
+                    else:
+                        results_appliance = fit_and_evaluate(
+                            appliance, classifiers, X, y, test_size, output_path, feature_cache, journal)
+                if results_appliance is not None:
+                    all_appliance_results.append(results_appliance)
+                    logging.info(f"✅ APPLIANCE {appliance.upper()} COMPLETED SUCCESSFULLY")
+                    logging.info("⏱️  Total evaluation time: %.2f seconds", eval_span.duration)
+                else:
+                    logging.warning(f"⚠️  APPLIANCE {appliance.upper()} FAILED - No successful model results")
             
-            logging.info(f"🏁 Appliance {appliance_count}/{len(appliance_list)} processing finished")
-            logging.info("=" * 80 + "\n")
-            pbar.update(1)
-            pbar.set_postfix({"appliance": appliance})
+                logging.info(f"🏁 Appliance {appliance_count}/{len(appliance_list)} processing finished")
+                logging.info("=" * 80 + "\n")
+                pbar.update(1)
+                pbar.set_postfix({"appliance": appliance})
 
     
     # Save combined results
@@ -322,7 +999,7 @@ def run_experiment(config_path):
         logging.info("💾 SAVING COMBINED EXPERIMENT RESULTS")
         logging.info("=" * 60)
         
-        all_result_df = pd.concat(all_appliance_results)        
+        all_result_df = pd.concat(all_appliance_results, ignore_index=True)        
         all_results_path = os.path.join(results_dir, f"{experiment_name}_results.csv")
         all_result_df.round(6).to_csv(all_results_path, index=False)
         
@@ -330,29 +1007,37 @@ def run_experiment(config_path):
         logging.info(f"📊 Total rows in combined results: {len(all_result_df)}")
         logging.info(f"📈 Successful appliances: {len(all_appliance_results)}/{len(appliance_list)}")
         
-        # Generate experiment summary
+        # Generate experiment summary (F1 for detection, MAE for counting)
         logging.info("📋 EXPERIMENT SUMMARY STATISTICS:")
-        avg_f1_by_appliance = all_result_df.groupby('Appliance')['F1Score'].mean()
-        avg_f1_by_model = all_result_df.groupby('Model')['F1Score'].mean()
+        score, label = ("MAE", "MAE") if task == "counting" else ("F1Score", "F1-Score")
+        avg_f1_by_appliance = all_result_df.groupby('Appliance')[score].mean()
+        avg_f1_by_model = all_result_df.groupby('Model')[score].mean()
         
-        logging.info(f"   📊 Average F1-Score by Appliance:")
+        logging.info(f"   📊 Average {label} by Appliance:")
         for appliance, avg_f1 in avg_f1_by_appliance.items():
             logging.info(f"      • {appliance}: {avg_f1:.4f}")
             
-        logging.info(f"   🤖 Average F1-Score by Model:")
+        logging.info(f"   🤖 Average {label} by Model:")
         for model, avg_f1 in avg_f1_by_model.items():
             logging.info(f"      • {model}: {avg_f1:.4f}")
         
         # Best overall performance
-        best_overall = all_result_df.loc[all_result_df['F1Score'].idxmax()]
+        if task == "counting":
+            best_overall = all_result_df.loc[all_result_df['MAE'].idxmin()]
+        else:
+            best_overall = all_result_df.loc[all_result_df['F1Score'].idxmax()]
         logging.info(f"   🏆 BEST OVERALL PERFORMANCE:")
         logging.info(f"      • Model: {best_overall['Model']}")
         logging.info(f"      • Appliance: {best_overall['Appliance']}")
-        logging.info(f"      • F1-Score: {best_overall['F1Score']:.4f}")
-        logging.info(f"      • Accuracy: {best_overall['Accuracy']:.4f}")
+        if task == "counting":
+            logging.info(f"      • MAE: {best_overall['MAE']:.4f}")
+            logging.info(f"      • Exact-match rate: {best_overall['ExactMatch']:.4f}")
+        else:
+            logging.info(f"      • F1-Score: {best_overall['F1Score']:.4f}")
+            logging.info(f"      • Accuracy: {best_overall['Accuracy']:.4f}")
         
-        logging.info("📄 COMPLETE RESULTS TABLE:")
-        logging.info("\n" + all_result_df.to_string(index=False))
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("📄 COMPLETE RESULTS TABLE:\n%s", all_result_df.to_string(index=False))
         logging.info("=" * 80)
     else:
         logging.error("❌ CRITICAL ERROR: No successful results from any appliance!")
@@ -372,6 +1057,20 @@ def run_experiment(config_path):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run NILS classifiers using a YAML config.")
-    parser.add_argument("--config", type=str, required=True, help="Path to config YAML file")
+    parser.add_argument("--config", type=str, help="Path to config YAML file")
+    parser.add_argument("--list-models", nargs="?", const="detection", default=None,
+                        choices=["detection", "counting"], metavar="TASK",
+                        help="List available model names (of TASK, default detection) and exit")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip (appliance, model) jobs already recorded in the journal for the same config")
+    parser.add_argument("--trace", type=str, default=None,
+                        help="Write timing spans to this file (.jsonl for JSON lines, .json for Chrome trace events)")
+    parser.add_argument("--profile", type=str, default=None, metavar="MODEL",
+                        help="Run the fits of MODEL under cProfile; stats go to {results_dir}/{experiment_name}_profiles")
     args = parser.parse_args()
-    run_experiment(args.config)
+    if args.list_models:
+        print("\n".join(list_models(args.list_models)))
+    elif args.config is None:
+        parser.error("--config is required")
+    else:
+        run_experiment(args.config, resume=args.resume, trace_file=args.trace, profile_model=args.profile)
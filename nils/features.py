@@ -0,0 +1,256 @@
+import os
+import hashlib
+import logging
+
+import numpy as np
+from sklearn.utils.metaestimators import available_if
+
+
+## Models whose expensive stage is an unsupervised random-kernel transform.
+## The transform is fitted once and shared; only the ridge head sees the labels.
+KERNEL_MODELS = ["Rocket", "Minirocket", "Arsenal"]
+
+## Estimator parameters that determine the kernel features. Only these key the cache, so a
+## RocketClassifier and a RocketRegressor with the same kernels share their features.
+TRANSFORM_PARAMS = ["rocket_transform", "num_kernels", "max_dilations_per_kernel", "n_features_per_kernel",
+                    "n_estimators", "random_state"]
+
+## Values of the ``feature_cache`` config key
+FEATURE_CACHE_MODES = ["memory", "disk", "off"]
+
+
+def check_feature_cache(value):
+    """
+    Validate the ``feature_cache`` config value; YAML reads a bare ``off`` as ``False``
+    (and ``on`` as ``True``), so the booleans map to ``off`` and ``memory``.
+    """
+    if isinstance(value, bool):
+        return "memory" if value else "off"
+    if value not in FEATURE_CACHE_MODES:
+        raise ValueError(f"feature_cache must be one of {FEATURE_CACHE_MODES}, got {value!r}")
+    return value
+
+
+def kernel_transformers(clf, random_state):
+    """
+    Build the unfitted ROCKET-family transformers equivalent to the kernel stage of ``clf``.
+
+    Parameters:
+        clf: A configured sktime ``RocketClassifier`` or ``Arsenal``.
+        random_state (int): Seed used when the classifier has none of its own.
+
+    Returns:
+        list: One transformer for RocketClassifier, ``n_estimators`` for Arsenal.
+    """
+    from sktime.transformations.panel.rocket import Rocket, MiniRocket, MultiRocket
+
+    params = clf.get_params()
+    seed = params["random_state"] if params.get("random_state") is not None else random_state
+    transform_cls = {"rocket": Rocket, "minirocket": MiniRocket, "multirocket": MultiRocket}[
+        params.get("rocket_transform", "rocket")]
+
+    def make(num_kernels, seed):
+        kwargs = {"num_kernels": num_kernels, "random_state": seed, "n_jobs": params.get("n_jobs", 1)}
+        if transform_cls is not Rocket:
+            kwargs["max_dilations_per_kernel"] = params["max_dilations_per_kernel"]
+        return transform_cls(**kwargs)
+
+    if "n_estimators" in params:  # Arsenal: one kernel set per ensemble member
+        rng = np.random.RandomState(seed)
+        return [make(params["num_kernels"], rng.randint(np.iinfo(np.int32).max))
+                for _ in range(params["n_estimators"])]
+    return [make(params["num_kernels"], seed)]
+
+
+def transform_is_data_independent(clf):
+    """ROCKET kernels depend only on the seed and series length; MiniRocket/MultiRocket fit biases on data."""
+    return clf.get_params().get("rocket_transform", "rocket") == "rocket"
+
+
+class KernelHead:
+    """
+    Supervised head trained on cached kernel features.
+
+    Mirrors the classifier stage of sktime's ``RocketClassifier`` (a single scaled
+    ``RidgeClassifierCV``) and ``Arsenal`` (one ridge per kernel set, votes weighted
+    by each ridge's cross-validation accuracy). A 2D ``y`` (one column per appliance)
+    is fitted as a single multi-output ridge; ensemble members are then weighted
+    equally because ``best_score_`` is no longer an accuracy.
+    """
+
+    def __init__(self):
+        self.heads_ = []
+        self.weights_ = []
+
+    def fit(self, features, y):
+        from sklearn.linear_model import RidgeClassifierCV
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        # features: (n_kernel_sets, n_samples, n_features)
+        self.multioutput_ = np.ndim(y) == 2
+        self.heads_ = []
+        self.weights_ = []
+        for F in features:
+            head = make_pipeline(
+                StandardScaler(with_mean=False),
+                RidgeClassifierCV(alphas=np.logspace(-3, 3, 10)),
+            )
+            head.fit(F, y)
+            self.heads_.append(head)
+            ensemble = len(features) > 1 and not self.multioutput_
+            self.weights_.append(head.steps[-1][1].best_score_ if ensemble else 1.0)
+        self.classes_ = np.array([0, 1]) if self.multioutput_ else self.heads_[0].classes_
+        return self
+
+    def predict_proba(self, features):
+        """Class probabilities, or per-column positive probabilities for a multi-output fit."""
+        if self.multioutput_:
+            votes = sum(weight * head.predict(F) for head, weight, F in zip(self.heads_, self.weights_, features))
+            return votes / sum(self.weights_)
+        votes = np.zeros((features.shape[1], len(self.classes_)))
+        for head, weight, F in zip(self.heads_, self.weights_, features):
+            pred = np.searchsorted(self.classes_, head.predict(F))
+            votes[np.arange(len(pred)), pred] += weight
+        return votes / votes.sum(axis=1, keepdims=True)
+
+    def decision_function(self, features):
+        """Weighted ridge margins: a ranking score for ROC/PR curves, unlike the 0/1 votes above."""
+        margins = sum(weight * head.decision_function(F) for head, weight, F in zip(self.heads_, self.weights_, features))
+        return margins / sum(self.weights_)
+
+    def predict(self, features):
+        if self.multioutput_:
+            return (self.predict_proba(features) > 0.5).astype(int)
+        return self.classes_[np.argmax(self.predict_proba(features), axis=1)]
+
+
+class KernelRegressionHead:
+    """
+    Regression counterpart of ``KernelHead``, mirroring sktime's ``RocketRegressor``
+    (a scaled ``RidgeCV``). A 2D ``y`` is fitted as one multi-output ridge; with several
+    kernel sets the predictions are averaged.
+    """
+
+    def fit(self, features, y):
+        from sklearn.linear_model import RidgeCV
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        self.heads_ = [make_pipeline(StandardScaler(with_mean=False), RidgeCV(alphas=np.logspace(-3, 3, 10))).fit(F, y)
+                       for F in features]
+        return self
+
+    def predict(self, features):
+        return sum(head.predict(F) for head, F in zip(self.heads_, features)) / len(self.heads_)
+
+
+class FeatureCache:
+    """
+    Cache of kernel feature matrices keyed by (dataset, data_limit, fit rows, seed, model).
+
+    Features are computed for every building at once so any train/test split can index
+    into them. Matrices are kept in memory and, when ``cache_dir`` is set, also written
+    to disk as ``.npy`` files so later runs (and other processes) can reuse them.
+    """
+
+    def __init__(self, dataset_key, cache_dir=None, random_state=None):
+        self.dataset_key = dataset_key
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+        self._memory = {}
+        self._transformers = {}
+
+    def _key(self, clf_name, clf, fit_rows):
+        rows = "all" if fit_rows is None else hashlib.sha1(np.ascontiguousarray(fit_rows)).hexdigest()
+        params = sorted((k, v) for k, v in clf.get_params().items() if k in TRANSFORM_PARAMS)
+        raw = f"{self.dataset_key}|{rows}|{self.random_state}|{clf_name}|{params}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, clf_name, clf, X, train_idx):
+        """
+        Return kernel features of shape (n_kernel_sets, n_buildings, n_features) for all rows of ``X``.
+
+        Data-independent transforms (ROCKET) are fitted without looking at ``X`` values, so
+        their cache entry is shared by every split; data-dependent ones are fitted on the
+        training rows only and keyed by them.
+        """
+        fit_rows = None if transform_is_data_independent(clf) else np.sort(train_idx)
+        key = self._key(clf_name, clf, fit_rows)
+
+        if key in self._memory:
+            logging.info(f"   ♻️  Reusing cached {clf_name} kernel features (memory)")
+            return self._memory[key]
+
+        disk_path = os.path.join(self.cache_dir, f"{key}.npy") if self.cache_dir else None
+        if disk_path and os.path.exists(disk_path):
+            logging.info(f"   ♻️  Reusing cached {clf_name} kernel features ({disk_path})")
+            features = np.load(disk_path, mmap_mode="r")
+            self._memory[key] = features
+            return features
+
+        logging.info(f"   🧮 Computing {clf_name} kernel features for {X.shape[0]} buildings")
+        X3d = np.asarray(X)[:, np.newaxis, :]
+        fit_X = X3d if fit_rows is None else X3d[fit_rows]
+        transformers = kernel_transformers(clf, self.random_state)
+        features = None
+        for i, transformer in enumerate(transformers):
+            F = transformer.fit(fit_X).transform(X3d).to_numpy(dtype=np.float32)
+            if features is None:
+                features = np.empty((len(transformers), *F.shape), dtype=np.float32)
+            features[i] = F
+        self._transformers[key] = transformers
+
+        if disk_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{disk_path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, features)
+            os.replace(tmp_path, disk_path)
+        self._memory[key] = features
+        return features
+
+    def transformers(self, clf_name, clf, X, train_idx):
+        """
+        Fitted transformers behind the features returned by ``get``, for persisting a full model.
+
+        When the features came from disk the transformers are re-fitted on the same rows
+        with the same seed, which reproduces them exactly.
+        """
+        fit_rows = None if transform_is_data_independent(clf) else np.sort(train_idx)
+        key = self._key(clf_name, clf, fit_rows)
+        if key not in self._transformers:
+            X3d = np.asarray(X)[:, np.newaxis, :]
+            fit_X = X3d if fit_rows is None else X3d[fit_rows]
+            self._transformers[key] = [t.fit(fit_X) for t in kernel_transformers(clf, self.random_state)]
+        return self._transformers[key]
+
+
+class KernelPipeline:
+    """
+    Self-contained kernel model (fitted transformers + ``KernelHead``) that scores raw series.
+
+    This is what gets persisted for Rocket/Minirocket/Arsenal, since the shared feature
+    cache that produced the training features is not part of the model.
+    """
+
+    def __init__(self, transformers, head):
+        self.transformers = transformers
+        self.head = head
+        if hasattr(head, "classes_"):
+            self.classes_ = head.classes_
+
+    def _features(self, X):
+        X3d = np.asarray(X)[:, np.newaxis, :]
+        return np.stack([t.transform(X3d).to_numpy(dtype=np.float32) for t in self.transformers])
+
+    def predict(self, X):
+        return self.head.predict(self._features(X))
+
+    # Only classification heads have probabilities; a regression pipeline must not claim any
+    @available_if(lambda self: hasattr(self.head, "predict_proba"))
+    def predict_proba(self, X):
+        return self.head.predict_proba(self._features(X))
+
+    @available_if(lambda self: hasattr(self.head, "decision_function"))
+    def decision_function(self, X):
+        return self.head.decision_function(self._features(X))
@@ -0,0 +1,143 @@
+import math
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from models import as_model_input
+
+## Share of the training buildings held out to rank models between rungs
+VALIDATION_SIZE = 0.25
+
+## Smallest subset (buildings) and window (time points) a rung is trained on
+MIN_BUILDINGS = 50
+MIN_TIME_POINTS = 24
+
+
+def set_time_limit(clf, seconds):
+    """
+    Hand a time budget to contractable estimators (ContractableBOSS, DrCIF, Arsenal, ...).
+
+    Returns:
+        bool: Whether ``clf`` accepted the limit.
+    """
+    if not hasattr(clf, "get_params") or "time_limit_in_minutes" not in clf.get_params(deep=False):
+        return False
+    # 0 means "no limit" for sktime, so never round down to it
+    clf.set_params(time_limit_in_minutes=max(seconds / 60, 0.05))
+    return True
+
+
+def rung_sizes(n_models, n_train, data_limit, eta):
+    """
+    Buildings and time points used at each rung before the final fit.
+
+    With ``R = ceil(log_eta(n_models))`` rungs, rung ``r`` trains on ``eta ** (r - R)`` of the
+    inner training buildings and of the ``data_limit`` window, so every rung costs about
+    ``eta`` times less per model than the next one.
+    """
+    n_rungs = math.ceil(math.log(n_models, eta)) if n_models > 1 else 0
+    sizes = []
+    for rung in range(n_rungs):
+        scale = eta ** (rung - n_rungs)
+        sizes.append((min(n_train, max(MIN_BUILDINGS, int(n_train * scale))),
+                      min(data_limit, max(MIN_TIME_POINTS, int(data_limit * scale)))))
+    return sizes
+
+
+def successive_halving(appliance, classifiers, X, y, train_idx, time_budget, evaluate, eta=3, random_state=None):
+    """
+    Spend a wall-clock budget on the models that look best on cheap fits.
+
+    All models are first fitted on a small subset of the training buildings with a short
+    ``data_limit`` window and ranked by F1 on held-out training buildings; the best
+    ``1 / eta`` move on to a rung ``eta`` times larger. Before each rung the cost is
+    extrapolated from the previous one and the search stops early when it would not fit
+    in what is left of ``time_budget``. The survivors that still fit in the budget are
+    then trained on the full training set and window by ``evaluate(clf_name, clf)``,
+    which scores them on the untouched test buildings.
+
+    Parameters:
+        appliance (str): Appliance being detected (for logging and the rung table).
+        classifiers (dict): Candidate models by name.
+        X (np.ndarray): Buildings x time matrix already cut to ``data_limit``.
+        y (np.ndarray): Binary labels.
+        train_idx (np.ndarray): Training rows; the test rows are never used for ranking.
+        time_budget (float): Seconds available for this appliance, final fits included.
+        evaluate (callable): ``evaluate(clf_name, clf) -> pd.DataFrame`` for a final fit.
+        eta (int): Reduction factor between rungs.
+        random_state (int, optional): Seed for the inner split and the rung subsets.
+
+    Returns:
+        tuple: (list of final result frames, rung table as a DataFrame)
+    """
+    from sklearn.base import clone
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import train_test_split
+
+    start = time.time()
+    rng = np.random.RandomState(random_state)
+    inner_idx, val_idx = train_test_split(
+        train_idx, test_size=VALIDATION_SIZE, stratify=y[train_idx], random_state=random_state)
+
+    survivors = list(classifiers)
+    scores, fit_times = {}, {}
+    rungs = []
+    for rung, (n_buildings, window) in enumerate(rung_sizes(len(survivors), len(inner_idx), X.shape[1], eta)):
+        remaining = time_budget - (time.time() - start)
+        if fit_times:
+            # Both the subset and the window grow by eta, so a fit costs roughly eta^2 more
+            estimate = sum(fit_times[name] * eta ** 2 for name in survivors)
+            if estimate > remaining:
+                logging.info("   ⏳ Rung %d would take ~%.0fs of the %.0fs left; stopping the search",
+                             rung, estimate, remaining)
+                break
+
+        if n_buildings < len(inner_idx):
+            subset, _ = train_test_split(inner_idx, train_size=n_buildings, stratify=y[inner_idx],
+                                         random_state=rng.randint(2 ** 31 - 1))
+        else:
+            subset = inner_idx
+        logging.info("   🪜 Rung %d: %d models on %d buildings × %d time points",
+                     rung, len(survivors), len(subset), window)
+
+        for name in survivors:
+            clf = clone(classifiers[name])
+            contracted = set_time_limit(clf, remaining / len(survivors))
+            fit_start = time.time()
+            try:
+                clf.fit(as_model_input(name, X[:, :window], subset), y[subset])
+                y_pred = clf.predict(as_model_input(name, X[:, :window], val_idx))
+                scores[name] = f1_score(y[val_idx], y_pred, zero_division=0)
+            except Exception as e:
+                logging.error("   ❌ %s failed at rung %d: %s: %s", name, rung, type(e).__name__, e)
+                scores[name] = -1.0
+            fit_times[name] = time.time() - fit_start
+            rungs.append({"Appliance": appliance, "Model": name, "Rung": rung, "Buildings": len(subset),
+                          "TimePoints": window, "ValidationF1": round(scores[name], 5),
+                          "FitTime": round(fit_times[name], 3), "Contracted": contracted})
+
+        ranked = sorted(survivors, key=lambda name: scores[name], reverse=True)
+        survivors = [name for name in ranked[:max(1, len(ranked) // eta)] if scores[name] >= 0] or ranked[:1]
+        logging.info("   🏅 Promoted: %s", survivors)
+
+    # Final fits, best first, as long as the extrapolated cost fits in the remaining budget
+    finalists = sorted(survivors, key=lambda name: scores.get(name, 0), reverse=True)
+    results = []
+    for i, name in enumerate(finalists):
+        remaining = time_budget - (time.time() - start)
+        if i > 0 and name in fit_times:
+            scale = (len(train_idx) / rungs[-1]["Buildings"]) * (X.shape[1] / rungs[-1]["TimePoints"])
+            if fit_times[name] * scale > remaining:
+                logging.info("   ⏳ No budget left for a final fit of %s", name)
+                continue
+        clf = clone(classifiers[name])
+        set_time_limit(clf, remaining / (len(finalists) - i))
+        results.append(evaluate(name, clf))
+
+    rung_table = pd.DataFrame(rungs)
+    if len(rung_table):
+        rung_table["Final"] = rung_table["Model"].isin([df["Model"].iloc[0] for df in results if df is not None])
+    logging.info("   ⏱️  Successive halving used %.0fs of a %.0fs budget", time.time() - start, time_budget)
+    return results, rung_table
@@ -0,0 +1,180 @@
+import os
+import io
+import json
+import time
+import logging
+import resource
+import threading
+from contextlib import contextmanager
+
+## Active trace output and profiling target of this process (see ``configure``)
+_writer = None
+_profile_model = None
+_profile_dir = None
+_local = threading.local()
+
+
+class TraceWriter:
+    """
+    Appends finished spans to a trace file.
+
+    ``.jsonl`` files get one JSON object per span. Any other extension gets Chrome trace
+    events ("JSON array format", viewable in chrome://tracing or Perfetto); that format
+    tolerates a missing closing bracket, so worker processes can append to the same file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chrome = not path.endswith(".jsonl")
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        if self.chrome:
+            line = json.dumps({
+                "name": record["name"],
+                "cat": "nils",
+                "ph": "X",
+                "ts": record["start"] * 1e6,
+                "dur": record["duration_s"] * 1e6,
+                "pid": record["pid"],
+                "tid": record["tid"],
+                "args": {key: value for key, value in record.items()
+                         if key not in ("name", "start", "duration_s", "pid", "tid")},
+            }, default=str) + ",\n"
+        else:
+            line = json.dumps(record, default=str) + "\n"
+        # One small O_APPEND write per span keeps lines from different processes whole
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+def start_trace(path, append=False):
+    """Create (or, with ``append``, continue) a trace file; spans go there once ``configure``d."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if not append or not os.path.exists(path):
+        with open(path, "w") as f:
+            f.write("" if path.endswith(".jsonl") else "[\n")
+
+
+def configure(trace_file=None, profile_model=None, profile_dir=None):
+    """
+    Set where spans go and which model is profiled in this process.
+
+    Worker processes call this with the settings of the parent run; it is cheap to call
+    again with the same values.
+    """
+    global _writer, _profile_model, _profile_dir
+    if trace_file is None:
+        _writer = None
+    elif _writer is None or _writer.path != trace_file:
+        _writer = TraceWriter(trace_file)
+    _profile_model = profile_model
+    _profile_dir = profile_dir
+
+
+def _rss_bytes():
+    # Current (not peak) resident set size where /proc is available
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _thread_count():
+    # Native threads (BLAS, OpenMP, numba) included where the OS exposes them
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return threading.active_count()
+
+
+class Span:
+    """
+    Timed section of a run; use through ``span``.
+
+    The wall-clock ``duration`` is always measured, so callers can log it. CPU time,
+    memory delta and thread count are only sampled, and the span only written, when
+    tracing is on.
+    """
+
+    __slots__ = ("name", "attrs", "duration", "_start", "_wall", "_cpu", "_rss", "_parent", "_depth")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.duration = None
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self._parent = stack[-1].name if stack else None
+        self._depth = len(stack)
+        stack.append(self)
+        if _writer is not None:
+            self._wall = time.time()
+            self._cpu = time.process_time()
+            self._rss = _rss_bytes()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        _local.stack.pop()
+        if _writer is not None:
+            _writer.write({
+                "name": self.name,
+                "parent": self._parent,
+                "depth": self._depth,
+                "start": self._wall,
+                "duration_s": self.duration,
+                "cpu_s": time.process_time() - self._cpu,
+                "rss_delta_mb": (_rss_bytes() - self._rss) / (1024 * 1024),
+                "threads": _thread_count(),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "error": None if exc_type is None else exc_type.__name__,
+                **self.attrs,
+            })
+        return False
+
+
+def span(name, **attrs):
+    """
+    Nested timing span, e.g. ``with span("fit", model=clf_name) as s: ...; s.duration``.
+
+    Parameters:
+        name (str): Span name (``load``, ``split``, ``fit``, ``predict``, ``metrics``, ...).
+        **attrs: Extra fields stored with the span (appliance, model, fold, shapes).
+    """
+    return Span(name, attrs)
+
+
+@contextmanager
+def profile(clf_name, label):
+    """
+    Run the block under cProfile when ``clf_name`` is the model selected with ``--profile``.
+
+    The stats are dumped to ``{profile_dir}/{clf_name}_{label}.prof`` (readable with
+    ``python -m pstats`` or snakeviz) and the top functions by cumulative time are logged.
+    """
+    if _profile_model != clf_name:
+        yield
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(_profile_dir, exist_ok=True)
+        path = os.path.join(_profile_dir, f"{clf_name}_{label}.prof")
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+        logging.info("   🔬 Profile of %s (%s) saved to: %s\n%s", clf_name, label, path, summary.getvalue())
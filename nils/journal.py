@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+
+import pandas as pd
+
+## Config keys that do not change the result of an individual (appliance, model) job:
+## how the sweep is executed and which jobs it contains
+IGNORED_KEYS = ["n_jobs", "save_models", "appliance_list", "models"]
+
+
+def splits_depend_on_appliances(config):
+    """Whether the train/test rows are stratified over the whole ``appliance_list``."""
+    return (config.get("cv_folds", 1) > 1 or config.get("multilabel", False)
+            or config.get("task", "detection") == "counting")
+
+
+def config_hash(config, *digests):
+    """
+    Hash an experiment config (plus the content hashes of its input files).
+
+    Keys in ``IGNORED_KEYS`` are left out, so a sweep can be resumed with a different
+    degree of parallelism or with appliances/models added to it. ``appliance_list`` is
+    kept when the splits are stratified over it (cross-validation folds, multi-label and
+    counting splits): other appliances give other splits, so earlier results do not carry over.
+    """
+    ignored = IGNORED_KEYS
+    if splits_depend_on_appliances(config):
+        ignored = [key for key in IGNORED_KEYS if key != "appliance_list"]
+    relevant = {key: value for key, value in config.items() if key not in ignored}
+    raw = json.dumps(relevant, sort_keys=True, default=str) + "|" + "|".join(digests)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class Journal:
+    """
+    Append-only JSON-lines record of every finished (appliance, model) result.
+
+    Each line is flushed and fsync'ed as soon as a job finishes, so a crash loses at most
+    the jobs that were running. Entries carry the config hash; on resume only entries with
+    the current hash count as done.
+
+    Parameters:
+        path (str): Journal file, typically ``{results_dir}/{experiment_name}_journal.jsonl``.
+        config_hash (str): Hash of the current config, see ``config_hash``.
+        resume (bool): Keep existing entries; otherwise the journal is started afresh.
+        model_store (ModelStore, optional): Where fitted models go; ``None`` disables saving them.
+    """
+
+    def __init__(self, path, config_hash, resume=False, model_store=None):
+        self.path = path
+        self.config_hash = config_hash
+        self.model_store = model_store
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if not resume and os.path.exists(path):
+            os.remove(path)
+        self._done = self._load()
+
+    def _load(self):
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write is simply ignored
+                    continue
+                if entry.get("config_hash") != self.config_hash:
+                    continue
+                done[(entry["appliance"], entry["model"])] = pd.DataFrame([entry["result"]])
+        return done
+
+    def result(self, appliance, model):
+        """The recorded one-row result of a finished job, or ``None`` if it still has to run."""
+        return self._done.get((appliance, model))
+
+    def is_done(self, appliances, model):
+        return all(self.result(appliance, model) is not None for appliance in appliances)
+
+    def record(self, results_df, model_path=None):
+        """Durably append one entry per result row."""
+        with open(self.path, "a") as f:
+            for row in results_df.to_dict(orient="records"):
+                self._done[(row["Appliance"], row["Model"])] = pd.DataFrame([row])
+                entry = {
+                    "config_hash": self.config_hash,
+                    "appliance": row["Appliance"],
+                    "model": row["Model"],
+                    "result": row,
+                    "model_path": model_path,
+                    "time": pd.Timestamp.now().isoformat(),
+                }
+                f.write(json.dumps(entry, default=float) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def model_path(self, appliance, model):
+        """Where the fitted model of a job is saved, or ``None`` when models are not kept."""
+        if self.model_store is None:
+            return None
+        return self.model_store.path(appliance, model)
@@ -1,44 +1,165 @@
 
-from sklearn.metrics import (
-    accuracy_score,
-    f1_score,
-    precision_score,
-    recall_score,
-    roc_auc_score
-)
 import logging
 
+import numpy as np
 
-def compute_metrics(y_true, y_pred, clf_name):
+
+def threshold_sweep(y_true, y_score):
+    """
+    Confusion counts at every distinct score threshold, from one sort of the scores.
+
+    Parameters:
+        y_true (array-like): Ground truth binary labels.
+        y_score (array-like): Scores; higher means more likely positive.
+
+    Returns:
+        tuple: (thresholds in decreasing order, true positives, false positives), where
+        entry ``i`` counts the samples with a score of at least ``thresholds[i]``.
+    """
+    order = np.argsort(np.asarray(y_score, dtype=float), kind="mergesort")[::-1]
+    y_score = np.asarray(y_score, dtype=float)[order]
+    y_true = np.asarray(y_true, dtype=bool)[order]
+    # Last position of each run of equal scores
+    last = np.r_[np.flatnonzero(np.diff(y_score)), len(y_score) - 1]
+    tps = np.cumsum(y_true)[last]
+    return y_score[last], tps, last + 1 - tps
+
+
+def best_threshold(y_true, y_score):
+    """
+    F1-optimal operating point on a set of scores (normally the training rows).
+
+    The threshold sits halfway between the lowest score kept positive and the next lower
+    score, so rows scoring at least it are exactly the ones counted by the sweep; ``nan``
+    when there are no positives to find.
+    """
+    thresholds, tps, fps = threshold_sweep(y_true, y_score)
+    positives = np.count_nonzero(y_true)
+    if not positives:
+        return np.nan
+    best = np.argmax(2 * tps / (tps + fps + positives))
+    if best + 1 < len(thresholds):
+        return (thresholds[best] + thresholds[best + 1]) / 2
+    return thresholds[best]
+
+
+def compute_metrics(y_true, y_pred, clf_name, y_score=None, threshold=None):
     """
     Compute classification metrics for a given set of predictions.
 
+    All binary, macro and weighted metrics come from one confusion matrix. ROC and PR AUC
+    come from one sweep over ``y_score``; without scores the hard predictions are swept,
+    which makes ``ROC_AUC`` the balanced accuracy. ``threshold`` is an operating point
+    chosen beforehand (see ``best_threshold``) and never tuned on these rows;
+    ``F1ScoreAtThreshold`` is the F1-score of ``y_score >= threshold``.
+
     Parameters:
         y_true (array-like): Ground truth binary labels.
         y_pred (array-like): Predicted labels.
         clf_name (str): Name of the classifier used.
+        y_score (array-like, optional): Positive-class probabilities or decision scores.
+        threshold (float, optional): Operating point for ``y_score`` (or ``y_pred``).
 
     Returns:
         dict: Dictionary containing classification metrics.
     """
+    def ratio(numerator, denominator):
+        return numerator / denominator if denominator else 0.0
+
     try:
-        metrics = {                    
-            "Accuracy": accuracy_score(y_true, y_pred),
-            "Precision": precision_score(y_true, y_pred, average="binary", zero_division=0),
-            "Recall": recall_score(y_true, y_pred, average="binary", zero_division=0),
-            "PrecisionMacro": precision_score(y_true, y_pred, average="macro", zero_division=0),
-            "RecallMacro": recall_score(y_true, y_pred, average="macro", zero_division=0),
-            "F1Score": f1_score(y_true, y_pred, average="binary", zero_division=0),
-            "F1ScoreMacro": f1_score(y_true, y_pred, average="macro", zero_division=0),
-            "F1ScoreWeighted": f1_score(y_true, y_pred, average="weighted", zero_division=0),
-            "ROC_AUC": roc_auc_score(y_true, y_pred),
-            "ROC_AUC_Macro": roc_auc_score(y_true, y_pred, average="macro"),
-            "ROC_AUC_Weighted": roc_auc_score(y_true, y_pred, average="weighted"),
+        y_true = np.asarray(y_true).astype(bool)
+        y_pred = np.asarray(y_pred).astype(bool)
+        tp = np.count_nonzero(y_true & y_pred)
+        fp = np.count_nonzero(~y_true & y_pred)
+        fn = np.count_nonzero(y_true & ~y_pred)
+        tn = len(y_true) - tp - fp - fn
+        positives, negatives = tp + fn, tn + fp
+
+        # Per-class scores, positive class first
+        precision = np.array([ratio(tp, tp + fp), ratio(tn, tn + fn)])
+        recall = np.array([ratio(tp, positives), ratio(tn, negatives)])
+        f1 = np.array([ratio(2 * tp, 2 * tp + fp + fn), ratio(2 * tn, 2 * tn + fn + fp)])
+        support = np.array([positives, negatives]) / len(y_true)
+
+        y_score = y_pred if y_score is None else np.asarray(y_score, dtype=float)
+        thresholds, tps, fps = threshold_sweep(y_true, y_score)
+        if positives and negatives:
+            tpr = np.r_[0, tps / positives]
+            fpr = np.r_[0, fps / negatives]
+            roc_auc = np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)
+            # Average precision: precision at each threshold weighted by the recall it adds
+            pr_auc = np.sum(np.diff(tpr) * tps / (tps + fps))
+        else:
+            roc_auc = pr_auc = np.nan
+        f1_at_threshold = np.nan
+        if threshold is not None and not np.isnan(threshold):
+            at_threshold = y_score >= threshold
+            tp_at = np.count_nonzero(y_true & at_threshold)
+            f1_at_threshold = ratio(2 * tp_at, np.count_nonzero(at_threshold) + positives)
+
+        metrics = {
+            "Accuracy": (tp + tn) / len(y_true),
+            "Precision": precision[0],
+            "Recall": recall[0],
+            "PrecisionMacro": precision.mean(),
+            "RecallMacro": recall.mean(),
+            "F1Score": f1[0],
+            "F1ScoreMacro": f1.mean(),
+            "F1ScoreWeighted": np.dot(f1, support),
+            # For one binary label, sklearn's macro and weighted ROC AUC are the plain AUC
+            "ROC_AUC": roc_auc,
+            "ROC_AUC_Macro": roc_auc,
+            "ROC_AUC_Weighted": roc_auc,
+            "PR_AUC": pr_auc,
+            "Threshold": np.nan if threshold is None else threshold,
+            "F1ScoreAtThreshold": f1_at_threshold,
         }
-        
-        metrics_rounded = {key: round(value, 5) for key, value in metrics.items()}
-        return metrics_rounded        
-        
+
+        metrics_rounded = {key: round(float(value), 5) for key, value in metrics.items()}
+        return metrics_rounded
+
     except Exception as e:
         logging.error(f"[{clf_name}] Metric computation failed: {e}")
         return {"Model": clf_name}
+
+
+def summarize_folds(fold_results):
+    """
+    Aggregate per-fold metrics into their mean and standard deviation.
+
+    Parameters:
+        fold_results (pd.DataFrame): One row per (Appliance, Model, Fold) as built from ``compute_metrics``.
+
+    Returns:
+        pd.DataFrame: One row per (Appliance, Model) with the mean of every metric under its
+        own name, its standard deviation as ``<metric>_std`` and the number of ``Folds``.
+    """
+    metric_columns = [col for col in fold_results.columns if col not in ("Appliance", "Model", "Fold")]
+    grouped = fold_results.groupby(["Appliance", "Model"], sort=False)[metric_columns]
+    summary = grouped.mean().round(5).join(grouped.std().round(5).add_suffix("_std"))
+    summary.insert(0, "Folds", grouped.size())
+    return summary.reset_index()
+
+
+def compute_count_metrics(Y_true, Y_pred):
+    """
+    Count metrics for every appliance at once.
+
+    Parameters:
+        Y_true (array-like): True counts, shape (n_samples, n_appliances).
+        Y_pred (array-like): Predicted (real-valued) counts of the same shape.
+
+    Returns:
+        dict: Metric name -> array with one value per appliance. ``ExactMatch`` and
+        ``WithinOne`` compare the predictions rounded to the nearest non-negative count.
+    """
+    Y_true = np.asarray(Y_true, dtype=float).reshape(len(Y_true), -1)
+    Y_pred = np.asarray(Y_pred, dtype=float).reshape(Y_true.shape)
+    errors = Y_pred - Y_true
+    rounded_errors = np.clip(np.rint(Y_pred), 0, None) - Y_true
+    return {
+        "MAE": np.round(np.abs(errors).mean(axis=0), 5),
+        "RMSE": np.round(np.sqrt((errors ** 2).mean(axis=0)), 5),
+        "ExactMatch": np.round((rounded_errors == 0).mean(axis=0), 5),
+        "WithinOne": np.round((np.abs(rounded_errors) <= 1).mean(axis=0), 5),
+    }
@@ -0,0 +1,168 @@
+import os
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.utils.metaestimators import available_if
+
+## Kinds of positive-class score a model is evaluated and thresholded on, with the operating
+## point used when none could be picked on the training rows
+SCORE_TYPES = {"margin": 0.0, "proba": 0.5, "label": 0.5}
+
+
+class ModelStore:
+    """
+    Directory of fitted models, one sub-directory per (appliance, model) job.
+
+    Each entry holds ``model.joblib`` (an object with ``predict``/``predict_proba`` on raw
+    buildings x time arrays) and ``meta.json`` with everything needed to score new meters
+    the same way: appliances, ``data_limit``, resolution, dataset digest, the config, the
+    kind of score the model was evaluated on and the per-appliance decision thresholds
+    picked on those scores of the training rows.
+
+    Parameters:
+        root (str): Store directory, typically ``{results_dir}/{experiment_name}_models``.
+        metadata (dict): Run-level metadata shared by every model saved in this run.
+    """
+
+    def __init__(self, root, metadata):
+        self.root = root
+        self.metadata = metadata
+
+    def path(self, appliance, model):
+        return os.path.join(self.root, f"{appliance or 'multilabel'}__{model}")
+
+    def save(self, appliances, model, predictor, thresholds=None, score_type=None):
+        """
+        Persist a fitted predictor for one job (``appliances`` is a list for multi-label models).
+
+        ``thresholds`` (one per appliance) are operating points on scores of ``score_type``
+        (see ``SCORE_TYPES``), by default the scores ``predict_with_scores`` evaluates.
+
+        Returns:
+            str: Directory the model was written to.
+        """
+        import joblib
+
+        appliance = appliances[0] if len(appliances) == 1 else None
+        path = self.path(appliance, model)
+        os.makedirs(path, exist_ok=True)
+
+        tmp_path = os.path.join(path, f"model.{os.getpid()}.tmp")
+        joblib.dump(predictor, tmp_path)
+        os.replace(tmp_path, os.path.join(path, "model.joblib"))
+
+        meta = dict(self.metadata, model=model, appliances=list(appliances),
+                    saved_at=pd.Timestamp.now().isoformat())
+        if thresholds is not None:
+            meta["thresholds"] = [float(threshold) for threshold in thresholds]
+            meta["score_type"] = score_type or infer_score_type(predictor)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+
+        logging.info(f"   💾 Fitted model saved to: {path}")
+        return path
+
+
+def load_model(path):
+    """
+    Load a model saved by ``ModelStore.save``.
+
+    Returns:
+        tuple: (predictor, metadata dict)
+    """
+    import joblib
+
+    with open(os.path.join(path, "meta.json"), "r") as f:
+        meta = json.load(f)
+    return joblib.load(os.path.join(path, "model.joblib")), meta
+
+
+class PerApplianceModel:
+    """
+    Multi-label wrapper around one fitted binary estimator per appliance.
+
+    Every method returns one column per appliance; ``decision_function`` exists when all
+    estimators have one, so the wrapper is scored like the estimators were evaluated.
+    """
+
+    def __init__(self, estimators):
+        self.estimators = estimators
+
+    def predict(self, X):
+        return np.column_stack([estimator.predict(X) for estimator in self.estimators])
+
+    def predict_proba(self, X):
+        return np.column_stack([positive_proba(estimator, X) for estimator in self.estimators])
+
+    @available_if(lambda self: all(hasattr(estimator, "decision_function") for estimator in self.estimators))
+    def decision_function(self, X):
+        return np.column_stack([estimator.decision_function(X) for estimator in self.estimators])
+
+
+def predict_with_scores(estimator, X):
+    """
+    Hard predictions and positive-class scores from a single pass over ``X``.
+
+    Ridge-based estimators give their decision margins; others their positive-class
+    probability, with the prediction taken as the most probable class. Estimators
+    without either return ``None`` scores.
+    """
+    if hasattr(estimator, "decision_function"):
+        return np.asarray(estimator.predict(X)), np.asarray(estimator.decision_function(X), dtype=float)
+    if not hasattr(estimator, "predict_proba"):
+        return np.asarray(estimator.predict(X)), None
+    proba = np.asarray(estimator.predict_proba(X), dtype=float)
+    classes = np.asarray(getattr(estimator, "classes_", np.arange(proba.shape[1])))
+    y_pred = classes[np.argmax(proba, axis=1)]
+    if 1 not in classes:
+        return y_pred, np.zeros(len(proba))
+    return y_pred, proba[:, list(classes).index(1)]
+
+
+def positive_proba(estimator, X):
+    """
+    Probability of the positive class, falling back to hard predictions for estimators
+    without ``predict_proba``.
+    """
+    if not hasattr(estimator, "predict_proba"):
+        return np.asarray(estimator.predict(X), dtype=float)
+    proba = np.asarray(estimator.predict_proba(X))
+    if proba.ndim == 1:
+        return proba
+    classes = list(getattr(estimator, "classes_", range(proba.shape[1])))
+    if 1 not in classes:
+        return np.zeros(len(proba))
+    return proba[:, classes.index(1)]
+
+
+def infer_score_type(estimator):
+    """
+    Kind of score ``predict_with_scores`` evaluates an estimator on: decision ``margin``,
+    positive-class ``proba``, or the hard ``label`` for estimators with neither.
+    """
+    if hasattr(estimator, "decision_function"):
+        return "margin"
+    if hasattr(estimator, "predict_proba"):
+        return "proba"
+    return "label"
+
+
+def positive_scores(estimator, X, score_type=None):
+    """
+    Scores of ``score_type`` (inferred from the estimator by default) for every building.
+
+    Single-appliance estimators give a 1D array; ``PerApplianceModel`` and multi-label
+    heads give one column per appliance.
+    """
+    score_type = score_type or infer_score_type(estimator)
+    if score_type not in SCORE_TYPES:
+        raise ValueError(f"score type must be one of {list(SCORE_TYPES)}, got {score_type!r}")
+    if score_type == "margin":
+        return np.asarray(estimator.decision_function(X), dtype=float)
+    if score_type == "label":
+        return np.asarray(estimator.predict(X), dtype=float)
+    if isinstance(estimator, PerApplianceModel):
+        return np.asarray(estimator.predict_proba(X), dtype=float)
+    return positive_proba(estimator, X)
@@ -1,40 +1,117 @@
-from sktime.classification.dummy import DummyClassifier
-from sktime.classification.kernel_based import Arsenal, RocketClassifier
-from sktime.classification.dictionary_based import IndividualBOSS, BOSSEnsemble, ContractableBOSS
-from sktime.classification.interval_based import TimeSeriesForestClassifier, RandomIntervalSpectralEnsemble, DrCIF
-from sktime.classification.distance_based import KNeighborsTimeSeriesClassifier
-from sktime.classification.deep_learning import MVTSTransformerClassifier
+import importlib
 import logging
 
+import numpy as np
+
 
 ## The model parameters are partiall adopted from https://github.com/adrienpetralia/ApplianceDetectionBenchmark
+## Registry of model factories: name -> (module, class, constructor kwargs).
+## Nothing is imported until a model is actually built, so listing models or selecting
+## only cheap ones never pays for heavy estimator families (e.g. torch for deep learning).
+MODEL_REGISTRY = {
+    "Dummy": ("sktime.classification.dummy", "DummyClassifier", {"strategy": "prior"}),
+    "Rocket": ("sktime.classification.kernel_based", "RocketClassifier", {"rocket_transform": "rocket", "n_jobs": -1}),
+    "Minirocket": ("sktime.classification.kernel_based", "RocketClassifier", {"rocket_transform": "minirocket", "n_jobs": -1}),
+    "Arsenal": ("sktime.classification.kernel_based", "Arsenal", {"n_jobs": -1}),
+    "TimeSeriesForest": ("sktime.classification.interval_based", "TimeSeriesForestClassifier", {"min_interval": 10, "n_jobs": -1}),
+    "Rise": ("sktime.classification.interval_based", "RandomIntervalSpectralEnsemble", {"n_jobs": -1}),
+    "DrCIF": ("sktime.classification.interval_based", "DrCIF", {"n_jobs": -1}),
+    "BOSS": ("sktime.classification.dictionary_based", "IndividualBOSS", {"n_jobs": -1}),
+    "eBOSS": ("sktime.classification.dictionary_based", "BOSSEnsemble", {"n_jobs": -1}),
+    "cBOSS": ("sktime.classification.dictionary_based", "ContractableBOSS", {"n_jobs": -1}),
+    "KNNeucli": ("sktime.classification.distance_based", "KNeighborsTimeSeriesClassifier", {"algorithm": "auto", "distance": "euclidean", "n_jobs": -1}),
+    "MVTSTransformerClassifier": ("sktime.classification.deep_learning", "MVTSTransformerClassifier", {
+        "d_model": 64,  # Reduced model dimension for faster training
+        "num_epochs": 5,  # Quick test with 5 epochs first
+        "batch_size": 32,  # Add batch size for better training
+        "lr": 0.001,  # Add learning rate
+        "dropout": 0.1,  # Add dropout for regularization
+        "verbose": True  # Enable training progress logging
+    }),
+}
+
+
+## Regressors for the counting task (number of appliances of each type), same layout as above
+REGRESSOR_REGISTRY = {
+    "Dummy": ("sktime.regression.dummy", "DummyRegressor", {"strategy": "mean"}),
+    "Rocket": ("sktime.regression.kernel_based", "RocketRegressor", {"rocket_transform": "rocket", "n_jobs": -1}),
+    "Minirocket": ("sktime.regression.kernel_based", "RocketRegressor", {"rocket_transform": "minirocket", "n_jobs": -1}),
+    "TimeSeriesForest": ("sktime.regression.interval_based", "TimeSeriesForestRegressor", {"min_interval": 10, "n_jobs": -1}),
+    "KNNeucli": ("sktime.regression.distance_based", "KNeighborsTimeSeriesRegressor", {"algorithm": "auto", "distance": "euclidean", "n_jobs": -1}),
+}
+
+
+def list_models(task="detection"):
+    """Names of all registered models of a task, without importing any of them."""
+    return list(REGRESSOR_REGISTRY if task == "counting" else MODEL_REGISTRY)
+
+
+def build_classifier(name, registry=MODEL_REGISTRY):
+    """Import and construct a single registered model."""
+    module_name, class_name, kwargs = registry[name]
+    estimator_cls = getattr(importlib.import_module(module_name), class_name)
+    return estimator_cls(**kwargs)
+
+
 def define_all_classifiers():
-    return {
-        "Dummy": DummyClassifier(strategy="prior"),
-        "Rocket": RocketClassifier(rocket_transform="rocket", n_jobs=-1),
-        "Minirocket": RocketClassifier(rocket_transform="minirocket", n_jobs=-1),
-        "Arsenal": Arsenal(n_jobs=-1),
-        "TimeSeriesForest": TimeSeriesForestClassifier(min_interval=10, n_jobs=-1),
-        "Rise": RandomIntervalSpectralEnsemble(n_jobs=-1),
-        "DrCIF": DrCIF(n_jobs=-1),
-        "BOSS": IndividualBOSS(n_jobs=-1),
-        "eBOSS": BOSSEnsemble(n_jobs=-1),
-        "cBOSS": ContractableBOSS(n_jobs=-1),
-        "KNNeucli": KNeighborsTimeSeriesClassifier(algorithm="auto", distance="euclidean", n_jobs=-1),
-        "MVTSTransformerClassifier": MVTSTransformerClassifier(
-            d_model=64,  # Reduced model dimension for faster training
-            num_epochs=5,  # Quick test with 5 epochs first
-            batch_size=32,  # Add batch size for better training
-            lr=0.001,  # Add learning rate
-            dropout=0.1,  # Add dropout for regularization
-            verbose=True  # Enable training progress logging
-        )
-    }
+    return {name: build_classifier(name) for name in MODEL_REGISTRY}
+
+
+## Relative fit cost of each model, used by the job scheduler to size core budgets.
+## Models with cost 1 are effectively single-threaded and are packed beside heavy ones.
+MODEL_COST = {
+    "Dummy": 1,
+    "KNNeucli": 1,
+    "Rocket": 2,
+    "Minirocket": 2,
+    "BOSS": 2,
+    "TimeSeriesForest": 2,
+    "Arsenal": 3,
+    "Rise": 3,
+    "cBOSS": 3,
+    "DrCIF": 4,
+    "eBOSS": 4,
+    "MVTSTransformerClassifier": 4,
+}
+
+
+## Models whose compiled (numba) kernels only accept float64 series
+FLOAT64_MODELS = ["BOSS", "eBOSS", "cBOSS"]
+
+## Rows gathered per block when a split is cast on its way to a model
+CAST_BLOCK_ROWS = 1024
+
+
+def as_model_input(clf_name, X, rows=None):
+    """
+    The rows of a series matrix (all rows by default) in the dtype ``clf_name`` is fed with.
+
+    Models get ``X``'s own dtype (float32 from the cache), so selecting ``rows`` is the
+    only copy. Models in ``FLOAT64_MODELS`` are converted here, at the edge: the rows are
+    cast into the float64 output a block at a time, never through a second full-size copy.
+    """
+    dtype = np.float64 if clf_name in FLOAT64_MODELS else X.dtype
+    if X.dtype == dtype:
+        return X if rows is None else X[rows]
+    n_rows = X.shape[0] if rows is None else len(rows)
+    out = np.empty((n_rows, X.shape[1]), dtype=dtype)
+    for start in range(0, n_rows, CAST_BLOCK_ROWS):
+        block = slice(start, start + CAST_BLOCK_ROWS)
+        out[block] = X[block] if rows is None else X[rows[block]]
+    return out
+
 
 def select_classifiers(selected_model_names):
-    all_classifiers = define_all_classifiers()
-    selected = {k: v for k, v in all_classifiers.items() if k in selected_model_names}
+    selected = {k: build_classifier(k) for k in MODEL_REGISTRY if k in selected_model_names}
     missing = [m for m in selected_model_names if m not in selected]
     if missing:
         logging.warning(f"Some specified models not found: {missing}")
-    return selected
\ No newline at end of file
+    return selected
+
+
+def select_regressors(selected_model_names):
+    selected = {k: build_classifier(k, REGRESSOR_REGISTRY) for k in REGRESSOR_REGISTRY if k in selected_model_names}
+    missing = [m for m in selected_model_names if m not in selected]
+    if missing:
+        logging.warning(f"Some specified regressors not found: {missing}")
+    return selected
@@ -0,0 +1,150 @@
+import os
+import logging
+import logging.handlers
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from threadpoolctl import threadpool_limits
+
+## kind: "features" (shared kernel transform) or "fit" (train + evaluate one model)
+## appliance: None when a single job covers every appliance (features, multi-label fits)
+## after: keys of jobs that must finish before this one starts
+## fold: index of the cross-validation split a fit job evaluates (None without cross-validation)
+Job = namedtuple("Job", ["kind", "appliance", "model", "cost", "cores", "after", "fold"], defaults=(None,))
+
+
+def job_key(job):
+    return (job.kind, job.appliance, job.model, job.fold)
+
+
+def resolve_n_jobs(n_jobs):
+    """Translate an sklearn-style ``n_jobs`` (-1 = all cores) into a core count."""
+    cpu_count = os.cpu_count() or 1
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, cpu_count + 1 + n_jobs)
+    return n_jobs
+
+
+def plan_jobs(appliance_list, model_names, max_cores, model_cost, shared_feature_models=(), n_folds=None):
+    """
+    Expand a config into a job graph of (appliance, model) fits.
+
+    Each job gets a core budget proportional to its cost share of the whole sweep:
+    single-threaded models (cost 1) always get one core, heavy models get more when
+    few jobs compete for the machine. Models in ``shared_feature_models`` get one
+    upstream "features" job that computes the shared kernel transform, and their fit
+    jobs wait on it. With ``n_folds``, every fit is expanded into one job per
+    cross-validation fold. Jobs are returned heaviest first.
+
+    Parameters:
+        appliance_list (list): Appliances to fit; ``[None]`` for one job per model.
+        model_names (list): Models to fit.
+        max_cores (int): Cores available to the whole sweep.
+        model_cost (dict): Relative cost per model name (default 1).
+        shared_feature_models (iterable): Models whose features are shared across appliances.
+        n_folds (int, optional): Number of cross-validation folds per fit.
+
+    Returns:
+        list[Job]
+    """
+    folds = [None] if n_folds is None else list(range(n_folds))
+    costs = {model: model_cost.get(model, 1) for model in model_names}
+    total_cost = sum(costs.values()) * len(appliance_list) * len(folds) or 1
+
+    def cores_for(cost):
+        if cost <= 1:
+            return 1
+        return max(1, min(max_cores, round(max_cores * cost / total_cost)))
+
+    jobs = []
+    for model in model_names:
+        after = ()
+        if model in shared_feature_models and len(appliance_list) * len(folds) > 1:
+            feature_job = Job("features", None, model, costs[model],
+                              cores_for(costs[model] * len(appliance_list) * len(folds)), ())
+            jobs.append(feature_job)
+            after = (job_key(feature_job),)
+        for appliance in appliance_list:
+            for fold in folds:
+                jobs.append(Job("fit", appliance, model, costs[model], cores_for(costs[model]), after, fold))
+
+    return sorted(jobs, key=lambda job: (job.kind != "features", -job.cost))
+
+
+def apply_core_budget(clf, cores):
+    """Limit an estimator's own parallelism to ``cores`` where it exposes ``n_jobs``."""
+    if hasattr(clf, "get_params") and "n_jobs" in clf.get_params(deep=False):
+        clf.set_params(n_jobs=cores)
+    return clf
+
+
+def _run_with_budget(worker, job, context):
+    # BLAS/OpenMP pools inside the worker are capped to the job's core budget
+    with threadpool_limits(limits=job.cores):
+        return worker(job, context)
+
+
+def _init_worker(log_queue):
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+
+def run_jobs(jobs, worker, context, max_cores, on_result):
+    """
+    Run a job graph on a process pool without oversubscribing ``max_cores``.
+
+    Jobs are started heaviest first; whenever the next heavy job does not fit in the free
+    cores, cheaper ready jobs are packed into the gap. ``worker(job, context)`` runs in a
+    child process and its return value is passed to ``on_result(job, result)`` in this
+    process as soon as the job finishes. Worker log records are forwarded to the handlers
+    of the root logger here.
+    """
+    pending = list(jobs)
+    running = {}
+    finished = set()
+    free_cores = max_cores
+
+    # Workers are spawned: forking a process whose numba/OpenMP threads have already started
+    # (any Rocket-family fit in this process) can leave it hanging at exit
+    mp_context = multiprocessing.get_context("spawn")
+    manager = mp_context.Manager()
+    log_queue = manager.Queue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+    listener.start()
+
+    try:
+        with ProcessPoolExecutor(
+                max_workers=max(1, min(max_cores, len(jobs))), mp_context=mp_context,
+                initializer=_init_worker, initargs=(log_queue,)) as pool:
+            while pending or running:
+                for job in list(pending):
+                    ready = all(key in finished for key in job.after)
+                    cores = min(job.cores, max_cores)
+                    if ready and (cores <= free_cores or not running):
+                        pending.remove(job)
+                        free_cores -= cores
+                        running[pool.submit(_run_with_budget, worker, job, context)] = job
+
+                if not running:
+                    # Remaining jobs depend on failed ones
+                    for job in pending:
+                        logging.error(f"❌ Skipping {job.kind} job {job.model}/{job.appliance}: a dependency failed")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    free_cores += min(job.cores, max_cores)
+                    try:
+                        on_result(job, future.result())
+                        finished.add(job_key(job))
+                    except Exception as e:
+                        logging.error(f"❌ FAILED: {job.kind} job {job.model}/{job.appliance}: {type(e).__name__}: {e}")
+    finally:
+        listener.stop()
+        manager.shutdown()
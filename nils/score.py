@@ -0,0 +1,139 @@
+import os
+import time
+import logging
+import argparse
+import warnings
+
+warnings.filterwarnings("ignore")
+warnings.simplefilter(action="ignore", category=FutureWarning)
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from cache import open_series, series_resolution
+from model_store import load_model, positive_scores, infer_score_type, SCORE_TYPES
+from models import as_model_input
+
+
+def load_models(model_paths):
+    """Load saved models and their metadata, keyed by the output column prefix."""
+    models = {}
+    for path in model_paths:
+        predictor, meta = load_model(path)
+        prefix = "multilabel" if len(meta["appliances"]) > 1 else meta["appliances"][0]
+        # A counting and a detection model of the same name and appliances must not replace each other
+        if meta.get("task", "detection") == "counting":
+            prefix = f"counting_{prefix}"
+        models[f"{prefix}_{meta['model']}"] = (predictor, meta)
+        logging.info(f"🤖 Loaded {meta['model']} for {meta['appliances']} "
+                     f"(data_limit={meta['data_limit']}, resolution={meta['resolution']} min) from {path}")
+    return models
+
+
+def check_compatible(models, store):
+    """Fail early when the meter data cannot be scored the way the models were trained."""
+    resolution = series_resolution(store.timestamps)
+    for name, (_, meta) in models.items():
+        if meta["resolution"] is not None and resolution is not None and meta["resolution"] != resolution:
+            raise ValueError(f"{name} was trained on {meta['resolution']}-minute data, "
+                             f"but the input is {resolution}-minute data")
+        if store.X.shape[1] < meta["data_limit"]:
+            raise ValueError(f"{name} needs {meta['data_limit']} time points, "
+                             f"but the input only has {store.X.shape[1]}")
+
+
+def score_chunk(models, X_chunk):
+    """
+    Predictions and positive-class scores of every model for one chunk of buildings.
+
+    Scores are of the kind the model was evaluated on (its ``score_type``): ridge margins
+    of kernel models are written as ``*_margin``, positive-class probabilities as ``*_proba``,
+    and models scored on their hard labels write no score column. Predictions threshold
+    the scores at the operating point picked on the training rows (0 for margins and 0.5
+    otherwise when the model has none), so each model runs once per chunk. Counting models
+    write their predicted counts as ``*_count`` columns instead.
+    """
+    columns = {}
+    for name, (predictor, meta) in models.items():
+        # Windowed models cut their own data_limit-long windows from the whole series
+        limit = None if meta.get("windowed") else meta["data_limit"]
+        X = as_model_input(meta["model"], np.ascontiguousarray(X_chunk[:, :limit]))
+        appliances = meta["appliances"]
+        if meta.get("task", "detection") == "counting":
+            counts = np.asarray(predictor.predict(X), dtype=float).reshape(len(X), -1)
+            for j, appliance in enumerate(appliances):
+                columns[f"{appliance}_{meta['model']}_count"] = counts[:, j]
+            continue
+        # Models saved before score types were recorded are scored as they were evaluated
+        score_type = meta.get("score_type") or infer_score_type(predictor)
+        scores = positive_scores(predictor, X, score_type).reshape(len(X), -1)
+        names = [f"{appliance}_{meta['model']}" for appliance in appliances] if len(appliances) > 1 else [name]
+        thresholds = [SCORE_TYPES[score_type] if threshold is None or np.isnan(threshold) else threshold
+                      for threshold in meta.get("thresholds", [None] * len(names))]
+        for j, column in enumerate(names):
+            columns[f"{column}_pred"] = (scores[:, j] >= thresholds[j]).astype(int)
+            if score_type != "label":
+                columns[f"{column}_{score_type}"] = scores[:, j]
+    return columns
+
+
+def score(model_paths, data_file, output_file, chunk_size=1024, cache_dir=None):
+    """
+    Stream a meter file through saved models, one chunk of buildings at a time.
+
+    The meter CSV is converted once into the memory-mapped cache; afterwards only
+    ``chunk_size`` buildings are materialised at a time, so memory stays bounded by the
+    chunk size no matter how many buildings the input holds. Rows are appended to
+    ``output_file`` as each chunk finishes.
+    """
+    models = load_models(model_paths)
+    # Finer meter data is block-averaged to the resolution the models were trained at
+    resolutions = {meta["resolution"] for _, meta in models.values()}
+    store = open_series(data_file, cache_dir, resolutions.pop() if len(resolutions) == 1 else None)
+    check_compatible(models, store)
+
+    n_buildings = store.X.shape[0]
+    logging.info(f"📊 Scoring {n_buildings} buildings in chunks of {chunk_size}")
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
+    start_time = time.time()
+    with tqdm(total=n_buildings, desc="Buildings", unit="bldg") as pbar:
+        for start in range(0, n_buildings, chunk_size):
+            stop = min(start + chunk_size, n_buildings)
+            chunk_start = time.time()
+
+            chunk = pd.DataFrame(score_chunk(models, store.X[start:stop]))
+            chunk.insert(0, "building", store.buildings[start:stop])
+            chunk.round(6).to_csv(output_file, mode="a", header=start == 0, index=False)
+
+            rate = (stop - start) / max(time.time() - chunk_start, 1e-9)
+            logging.info(f"   ✅ Buildings {start}-{stop - 1} scored ({rate:.1f} buildings/s)")
+            pbar.update(stop - start)
+            pbar.set_postfix({"buildings/s": f"{rate:.1f}"})
+
+    total_time = time.time() - start_time
+    logging.info(f"🏁 Scored {n_buildings} buildings in {total_time:.2f} seconds "
+                 f"({n_buildings / max(total_time, 1e-9):.1f} buildings/s)")
+    logging.info(f"📁 Predictions saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score meter data with saved NILS models.")
+    parser.add_argument("--model", type=str, required=True, action="append",
+                        help="Saved model directory (from save_models: true); repeat to score several models")
+    parser.add_argument("--data", type=str, required=True, help="Wide meter CSV (one column per building)")
+    parser.add_argument("--output", type=str, required=True,
+                        help="Output CSV for predictions, scores and counts")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Buildings scored per chunk")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Directory for the binary data cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-8s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+    score(args.model, args.data, args.output, args.chunk_size, args.cache_dir)
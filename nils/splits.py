@@ -0,0 +1,89 @@
+import numpy as np
+
+
+def iterative_stratification(Y, proportions, random_state=None):
+    """
+    Assign samples to folds so every label keeps its prevalence in every fold.
+
+    Implements the iterative stratification of Sechidis et al. (2011): labels are
+    processed rarest first, and each example carrying the current label goes to the
+    fold that still needs the most examples of that label (ties broken by overall
+    demand, then at random).
+
+    Parameters:
+        Y (array-like): Binary label matrix of shape (n_samples, n_labels).
+        proportions (array-like): Fraction of samples wanted in each fold.
+        random_state (int, optional): Seed for tie breaking.
+
+    Returns:
+        np.ndarray: Fold index (0 .. len(proportions) - 1) of each sample.
+    """
+    rng = np.random.RandomState(random_state)
+    Y = np.asarray(Y, dtype=bool)
+    if Y.ndim == 1:
+        Y = Y[:, np.newaxis]
+    n_samples = Y.shape[0]
+    proportions = np.asarray(proportions, dtype=float)
+
+    fold_demand = proportions * n_samples
+    label_demand = np.outer(proportions, Y.sum(axis=0)).astype(float)
+    folds = np.full(n_samples, -1)
+    remaining = Y.copy()
+
+    while remaining.any():
+        # Rarest label among the examples still unassigned
+        counts = remaining.sum(axis=0).astype(float)
+        counts[counts == 0] = np.inf
+        label = np.argmin(counts)
+
+        for i in rng.permutation(np.flatnonzero(remaining[:, label])):
+            demand = label_demand[:, label]
+            candidates = np.flatnonzero(demand == demand.max())
+            if len(candidates) > 1:
+                overall = fold_demand[candidates]
+                candidates = candidates[overall == overall.max()]
+            fold = candidates[rng.randint(len(candidates))]
+
+            folds[i] = fold
+            label_demand[fold] -= Y[i]
+            fold_demand[fold] -= 1
+            remaining[i] = False
+
+    # Examples without any positive label only balance fold sizes
+    for i in rng.permutation(np.flatnonzero(folds == -1)):
+        candidates = np.flatnonzero(fold_demand == fold_demand.max())
+        fold = candidates[rng.randint(len(candidates))]
+        folds[i] = fold
+        fold_demand[fold] -= 1
+
+    return folds
+
+
+def iterative_train_test_split(Y, test_size, random_state=None):
+    """
+    Single train/test split stratified over all label columns at once.
+
+    Returns:
+        tuple: (train_idx, test_idx) index arrays.
+    """
+    folds = iterative_stratification(Y, [test_size, 1 - test_size], random_state)
+    return np.flatnonzero(folds == 1), np.flatnonzero(folds == 0)
+
+
+def cross_validation_folds(Y, n_folds, n_repeats=1, random_state=None):
+    """
+    Repeated k-fold splits stratified over all label columns at once.
+
+    Each repeat reshuffles the assignment (seed ``random_state + repeat``), so the same
+    splits can be shared by every appliance and every model of an experiment.
+
+    Returns:
+        list: ``n_folds * n_repeats`` (train_idx, test_idx) tuples, repeat by repeat.
+    """
+    splits = []
+    for repeat in range(n_repeats):
+        seed = None if random_state is None else random_state + repeat
+        folds = iterative_stratification(Y, np.full(n_folds, 1 / n_folds), seed)
+        for fold in range(n_folds):
+            splits.append((np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)))
+    return splits
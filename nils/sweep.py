@@ -0,0 +1,361 @@
+import os
+import glob
+import json
+import time
+import yaml
+import socket
+import sqlite3
+import logging
+import argparse
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import pandas as pd
+
+from models import list_models
+from detect import expand_resolutions
+from features import check_feature_cache
+
+## Seconds a claimed task stays with its worker; a live worker renews it every third of that
+LEASE_SECONDS = 600
+
+## Attempts (failures or expired leases) before a task is marked failed
+MAX_ATTEMPTS = 3
+
+## Seconds an idle worker waits before asking the queue again
+POLL_SECONDS = 10
+
+## Stands for "every appliance" / "every model" of the experiment in a task
+ALL = "*"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    name TEXT PRIMARY KEY,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    experiment TEXT NOT NULL,
+    appliance TEXT NOT NULL,
+    model TEXT NOT NULL,
+    config TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT,
+    finished REAL,
+    UNIQUE (experiment, appliance, model)
+);
+"""
+
+
+def task_units(config):
+    """
+    The (appliance, model) units an experiment is split into, in the order ``run_config`` runs them.
+
+    Units follow what ``run_config`` trains together: one (appliance, model) fit by default,
+    one model for all appliances with ``multilabel``, ``task: counting`` or ``cv_folds`` (the
+    folds are stratified over every appliance, so a task must see all of them to get the
+    folds of a single-process run), and all models of one appliance with ``time_budget``
+    (successive halving ranks them against each other).
+    """
+    task = config.get("task", "detection")
+    models = [name for name in list_models(task) if name in config["models"]]
+    all_appliances = config.get("multilabel", False) or config.get("cv_folds", 1) > 1
+    if task == "counting" or (all_appliances and config.get("time_budget") is None):
+        return [(ALL, model) for model in models]
+    if config.get("time_budget") is not None:
+        return [(appliance, ALL) for appliance in config["appliance_list"]]
+    return [(appliance, model) for appliance in config["appliance_list"] for model in models]
+
+
+def task_dir(config, appliance, model):
+    name = f"{'all' if appliance == ALL else appliance}__{'all' if model == ALL else model}"
+    return os.path.join(config["results_dir"], f"{config['experiment_name']}_tasks", name)
+
+
+def task_config(config, appliance, model):
+    """The config a worker runs for one unit; results go to the unit's own directory."""
+    feature_cache = check_feature_cache(config.get("feature_cache", "off"))
+    return dict(
+        config,
+        appliance_list=config["appliance_list"] if appliance == ALL else [appliance],
+        models=config["models"] if model == ALL else [model],
+        results_dir=task_dir(config, appliance, model),
+        # Tasks run in separate processes (and nodes), so kernel features are shared through disk
+        feature_cache="disk" if feature_cache == "memory" else feature_cache,
+    )
+
+
+class WorkQueue:
+    """
+    SQLite-backed task queue shared by the coordinator, the workers and the merge step.
+
+    A worker claims a task by taking a lease on it and keeps renewing the lease while the
+    task runs. A task whose lease expires (its worker died) or that raised is handed out
+    again, up to ``max_attempts`` times, then marked failed. Every state change is one
+    ``BEGIN IMMEDIATE`` transaction, so any number of workers can share the file; on a
+    network filesystem it must support POSIX locks.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def submit(self, config, max_attempts=MAX_ATTEMPTS):
+        """Add the tasks of one experiment; tasks already in the queue are left as they are."""
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO experiments (name, config) VALUES (?, ?)",
+                       (config["experiment_name"], json.dumps(config)))
+            added = 0
+            for appliance, model in task_units(config):
+                added += db.execute(
+                    "INSERT OR IGNORE INTO tasks (experiment, appliance, model, config, max_attempts) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (config["experiment_name"], appliance, model,
+                     json.dumps(task_config(config, appliance, model)), max_attempts)).rowcount
+        return added
+
+    def claim(self, worker, lease=LEASE_SECONDS):
+        """Lease the oldest runnable task to ``worker``, or return ``None`` when there is none."""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("UPDATE tasks SET status = 'failed', error = 'lease expired on the last attempt' "
+                       "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts", (now,))
+            task = db.execute("SELECT * FROM tasks WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                              "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if task is None:
+                return None
+            db.execute("UPDATE tasks SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                       "WHERE id = ?", (worker, now + lease, task["id"]))
+        return task
+
+    def renew(self, task_id, worker, lease=LEASE_SECONDS):
+        """Extend a lease; ``False`` means the task was handed to another worker meanwhile."""
+        with self._transaction() as db:
+            return db.execute("UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                              (time.time() + lease, task_id, worker)).rowcount == 1
+
+    def complete(self, task_id, worker):
+        with self._transaction() as db:
+            return db.execute("UPDATE tasks SET status = 'done', finished = ?, error = NULL "
+                              "WHERE id = ? AND worker = ? AND status = 'running'",
+                              (time.time(), task_id, worker)).rowcount == 1
+
+    def fail(self, task_id, worker, error):
+        """Record a failed attempt: the task goes back to pending until it runs out of attempts."""
+        with self._transaction() as db:
+            db.execute("UPDATE tasks SET error = ?, lease_until = NULL, "
+                       "status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END "
+                       "WHERE id = ? AND worker = ? AND status = 'running'", (error, task_id, worker))
+
+    def retry_failed(self):
+        with self._transaction() as db:
+            return db.execute("UPDATE tasks SET status = 'pending', attempts = 0 WHERE status = 'failed'").rowcount
+
+    def counts(self):
+        """Number of tasks per experiment and status."""
+        rows = self.db.execute("SELECT experiment, status, COUNT(*) AS n FROM tasks GROUP BY experiment, status")
+        counts = {}
+        for row in rows:
+            counts.setdefault(row["experiment"], {})[row["status"]] = row["n"]
+        return counts
+
+    def experiments(self):
+        return [json.loads(row["config"]) for row in self.db.execute("SELECT config FROM experiments ORDER BY rowid")]
+
+    def tasks(self, experiment=None):
+        if experiment is None:
+            return self.db.execute("SELECT * FROM tasks ORDER BY id").fetchall()
+        return self.db.execute("SELECT * FROM tasks WHERE experiment = ? ORDER BY id", (experiment,)).fetchall()
+
+
+def submit(queue_path, config_paths, max_attempts=MAX_ATTEMPTS):
+    """Coordinator: expand every config (and its resolutions) into tasks on the queue."""
+    queue = WorkQueue(queue_path)
+    for config_path in config_paths:
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f)
+        for experiment in expand_resolutions(config):
+            added = queue.submit(experiment, max_attempts)
+            logging.info(f"📤 {experiment['experiment_name']}: {added} new task(s) from {config_path}")
+
+
+def run_task(config):
+    """Run one task's config in a fresh child process; a task that produced no results counts as failed."""
+    from detect import run_config
+
+    run_config(config, resume=True)
+    results_path = os.path.join(config["results_dir"], f"{config['experiment_name']}_results.csv")
+    if not os.path.exists(results_path):
+        raise RuntimeError(f"no results written, see {config['results_dir']}/{config['experiment_name']}_log.txt")
+
+
+def work(queue_path, lease=LEASE_SECONDS, n_jobs=None):
+    """
+    Worker: claim and run tasks until no task is pending or running anywhere.
+
+    Each task runs in its own child process while this process renews the lease, so a
+    task that crashes its process is retried, and one whose worker dies is reclaimed
+    by another worker once the lease expires.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(queue_path)
+    context = multiprocessing.get_context("spawn")
+    finished = 0
+    while True:
+        task = queue.claim(worker, lease)
+        if task is None:
+            statuses = {}
+            for counts in queue.counts().values():
+                for status, n in counts.items():
+                    statuses[status] = statuses.get(status, 0) + n
+            if not statuses.get("pending") and not statuses.get("running"):
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+
+        config = json.loads(task["config"])
+        if n_jobs is not None:
+            config["n_jobs"] = n_jobs
+        logging.info(f"🚀 [{worker}] {task['experiment']} {task['appliance']}/{task['model']} "
+                     f"(attempt {task['attempts'] + 1}/{task['max_attempts']})")
+        start = time.time()
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            future = pool.submit(run_task, config)
+            while True:
+                try:
+                    future.result(timeout=lease / 3)
+                except TimeoutError:
+                    if not queue.renew(task["id"], worker, lease):
+                        logging.warning(f"⚠️  [{worker}] Lost the lease on task {task['id']}")
+                    continue
+                except (Exception, SystemExit) as e:
+                    queue.fail(task["id"], worker, f"{type(e).__name__}: {e}")
+                    logging.error(f"❌ [{worker}] Task {task['id']} failed: {type(e).__name__}: {e}")
+                else:
+                    queue.complete(task["id"], worker)
+                    finished += 1
+                    logging.info(f"✅ [{worker}] Task {task['id']} done in {time.time() - start:.0f}s")
+                break
+    logging.info(f"🏁 [{worker}] No tasks left; ran {finished} task(s)")
+
+
+def configure_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-8s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+
+def spawn_worker(queue_path, lease, n_jobs):
+    configure_logging()
+    work(queue_path, lease, n_jobs)
+
+
+def merge(queue_path):
+    """Rebuild ``{experiment_name}_results.csv`` and the per-appliance outputs from the task directories."""
+    queue = WorkQueue(queue_path)
+    counts = queue.counts()
+    for config in queue.experiments():
+        name = config["experiment_name"]
+        incomplete = {status: n for status, n in counts.get(name, {}).items() if status != "done"}
+        if incomplete:
+            logging.warning(f"⚠️  {name}: merging with unfinished tasks {incomplete}")
+        merge_experiment(config, queue.tasks(name))
+
+
+def merge_experiment(config, tasks):
+    name = config["experiment_name"]
+    output_path = os.path.join(config["results_dir"], name)
+    model_order = {model: i for i, model in enumerate(list_models(config.get("task", "detection")))}
+
+    # Same-named per-appliance files ({appliance}.csv, _folds.csv, _halving.csv) are stacked
+    tables = {}
+    for task in tasks:
+        task_output = os.path.join(task_dir(config, task["appliance"], task["model"]), name)
+        for path in sorted(glob.glob(os.path.join(task_output, "*.csv"))):
+            tables.setdefault(os.path.basename(path), []).append(pd.read_csv(path))
+    if not tables:
+        logging.error(f"❌ {name}: no task results to merge")
+        return
+
+    os.makedirs(output_path, exist_ok=True)
+    for filename, frames in tables.items():
+        table = pd.concat(frames, ignore_index=True)
+        if len(frames) > 1 and "Model" in table.columns:
+            # Models in the order run_config evaluates them
+            table = table.sort_values("Model", key=lambda models: models.map(model_order), kind="stable")
+        tables[filename] = table
+        table.to_csv(os.path.join(output_path, filename), index=False)
+
+    results = [tables[f"{appliance}.csv"] for appliance in config["appliance_list"] if f"{appliance}.csv" in tables]
+    results_path = os.path.join(config["results_dir"], f"{name}_results.csv")
+    pd.concat(results, ignore_index=True).to_csv(results_path, index=False)
+    logging.info(f"📁 {name}: merged {len(tasks)} task(s) into {results_path}")
+
+
+def status(queue_path):
+    queue = WorkQueue(queue_path)
+    for experiment, counts in queue.counts().items():
+        logging.info(f"📊 {experiment}: " + ", ".join(f"{status} {n}" for status, n in sorted(counts.items())))
+    for task in queue.tasks():
+        if task["status"] == "failed":
+            logging.error(f"❌ {task['experiment']} {task['appliance']}/{task['model']}: {task['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run NILS experiment sweeps from a shared work queue.")
+    parser.add_argument("--queue", type=str, required=True, help="SQLite queue file (on a filesystem all nodes share)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="Expand configs into tasks on the queue")
+    submit_parser.add_argument("configs", nargs="+", help="Experiment config YAML files")
+    submit_parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS, help="Attempts per task")
+
+    work_parser = commands.add_parser("work", help="Claim and run tasks until the queue is drained")
+    work_parser.add_argument("--processes", type=int, default=1, help="Worker processes on this machine")
+    work_parser.add_argument("--lease", type=float, default=LEASE_SECONDS, help="Lease length in seconds")
+    work_parser.add_argument("--n-jobs", type=int, default=None, help="Override n_jobs of every task")
+
+    commands.add_parser("merge", help="Write the combined and per-appliance results of every experiment")
+    commands.add_parser("status", help="Show task counts and failures")
+    commands.add_parser("retry", help="Put failed tasks back on the queue")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.command == "submit":
+        submit(args.queue, args.configs, args.max_attempts)
+    elif args.command == "work":
+        # Extra local workers behave exactly like workers started on other nodes
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=spawn_worker, args=(args.queue, args.lease, args.n_jobs))
+                   for _ in range(args.processes - 1)]
+        for process in workers:
+            process.start()
+        work(args.queue, args.lease, args.n_jobs)
+        for process in workers:
+            process.join()
+    elif args.command == "merge":
+        merge(args.queue)
+    elif args.command == "status":
+        status(args.queue)
+    elif args.command == "retry":
+        logging.info(f"🔁 {WorkQueue(args.queue).retry_failed()} failed task(s) back on the queue")
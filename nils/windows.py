@@ -0,0 +1,113 @@
+import numpy as np
+
+## Upper bound on the windows handed to the estimator per predict call; only this many
+## windows are ever copied out of the (zero-copy) strided view at a time
+PREDICT_WINDOWS = 8192
+
+## Default cap on training windows per building. Estimators need the training windows as one
+## contiguous panel, so fitting holds max_windows times the data_limit-long training matrix
+DEFAULT_MAX_WINDOWS = 32
+
+AGGREGATIONS = ["vote", "proba"]
+
+
+def window_starts(n_points, window, stride, max_windows=None):
+    """
+    Start offsets of the windows cut from a series of ``n_points`` points.
+
+    With ``max_windows``, the stride is widened (never subsampled at random) so at most
+    ``max_windows`` evenly spaced windows remain.
+    """
+    if n_points < window:
+        raise ValueError(f"series of {n_points} points is shorter than the {window}-point window")
+    n_windows = (n_points - window) // stride + 1
+    if max_windows is not None and n_windows > max_windows:
+        stride *= -(-n_windows // max_windows)
+    return np.arange(0, n_points - window + 1, stride)
+
+
+def window_view(X, window, stride, max_windows=None):
+    """
+    All windows of every building as a read-only strided view, without copying ``X``.
+
+    Parameters:
+        X (np.ndarray): Buildings x time matrix (a memory-mapped cache works too).
+        window (int): Points per window (the experiment's ``data_limit``).
+        stride (int): Points between the starts of consecutive windows.
+        max_windows (int, optional): Cap on windows per building (see ``window_starts``).
+
+    Returns:
+        np.ndarray: View of shape (n_buildings, n_windows, window).
+    """
+    starts = window_starts(X.shape[1], window, stride, max_windows)
+    step = starts[1] - starts[0] if len(starts) > 1 else 1
+    view = np.lib.stride_tricks.sliding_window_view(X, window, axis=1)
+    return view[:, :starts[-1] + 1:step]
+
+
+class WindowedClassifier:
+    """
+    Train an estimator on every window of each building's series and predict per building.
+
+    Each building of ``fit`` contributes all its windows with the building's label, so a
+    split by building (as done upstream) keeps every window of a building on one side.
+    At predict time the windows of a building are combined either by majority ``vote``
+    of the window predictions or by averaging the window probabilities (``proba``);
+    regressors average their window predictions. ``predict_proba`` returns the share of
+    votes (or the mean probability) of each class.
+
+    sktime estimators have no incremental fit, so ``fit`` copies every training window into
+    one panel: ``n_windows`` times the size of a single-window training matrix, which is
+    why ``max_windows`` defaults to ``DEFAULT_MAX_WINDOWS``. Prediction is bounded by
+    ``PREDICT_WINDOWS`` whatever the number of windows.
+    """
+
+    def __init__(self, estimator, window, stride=None, aggregation="vote", max_windows=DEFAULT_MAX_WINDOWS):
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"window aggregation must be one of {AGGREGATIONS}, got {aggregation!r}")
+        self.estimator = estimator
+        self.window = window
+        self.stride = stride or window
+        self.aggregation = aggregation
+        self.max_windows = max_windows
+
+    def _views(self, X):
+        return window_view(np.asarray(X), self.window, self.stride, self.max_windows)
+
+    def fit(self, X, y):
+        windows = self._views(X)
+        n_buildings, n_windows, _ = windows.shape
+        # Estimators need one contiguous 2D panel: this copies all n_windows windows of every
+        # training building (the view itself is free), bounded by max_windows
+        self.estimator.fit(windows.reshape(-1, self.window), np.repeat(y, n_windows, axis=0))
+        self.classes_ = np.asarray(getattr(self.estimator, "classes_", np.unique(y)))
+        self.n_windows_ = n_windows
+        return self
+
+    def _aggregate(self, X, score):
+        # Buildings are scored a chunk at a time so only PREDICT_WINDOWS windows are copied at once
+        windows = self._views(X)
+        n_buildings, n_windows, _ = windows.shape
+        chunk = max(1, PREDICT_WINDOWS // n_windows)
+        building_scores = []
+        for start in range(0, n_buildings, chunk):
+            window_scores = score(windows[start:start + chunk].reshape(-1, self.window))
+            building_scores.append(window_scores.reshape(-1, n_windows, *window_scores.shape[1:]).mean(axis=1))
+        return np.concatenate(building_scores)
+
+    def _is_regressor(self):
+        return getattr(self.estimator, "_estimator_type", None) == "regressor"
+
+    def _window_scores(self, windows):
+        if self.aggregation == "proba" and hasattr(self.estimator, "predict_proba"):
+            return np.asarray(self.estimator.predict_proba(windows), dtype=float)
+        votes = np.asarray(self.estimator.predict(windows))
+        return (votes[:, np.newaxis] == self.classes_).astype(float)
+
+    def predict_proba(self, X):
+        return self._aggregate(X, self._window_scores)
+
+    def predict(self, X):
+        if self._is_regressor():
+            return self._aggregate(X, lambda windows: np.asarray(self.estimator.predict(windows), dtype=float))
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The nils modules import each other by their flat names, as when run as scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nils"))
+
+APPLIANCES = ["cooling_ON", "fans_ON", "heating_ON"]
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory):
+    """A small hourly data file and label file in the comstock layout, with learnable labels."""
+    rng = np.random.RandomState(0)
+    n_buildings, n_points = 60, 96
+    ids = np.arange(1000, 1000 + n_buildings)
+    labels = pd.DataFrame({appliance: rng.rand(n_buildings) < p for appliance, p in zip(APPLIANCES, [0.6, 0.4, 0.3])})
+    labels = labels.astype(int)
+
+    hours = np.arange(n_points)
+    daily = np.sin(2 * np.pi * hours / 24)
+    series = rng.normal(0, 0.3, (n_points, n_buildings))
+    series += np.outer(daily, 1 + labels["cooling_ON"]) + labels["fans_ON"].to_numpy() + 0.5 * labels["heating_ON"].to_numpy()
+
+    path = tmp_path_factory.mktemp("dataset")
+    data_file = str(path / "series_60min.csv")
+    label_file = str(path / "labels_60min.csv")
+    data = pd.DataFrame(series, columns=[f"{i}-0" for i in ids])
+    data.insert(0, "Timestamp", pd.date_range("2018-01-01", periods=n_points, freq="60min").astype(str))
+    data.to_csv(data_file, index=False)
+    labels.assign(id=ids).to_csv(label_file, index=False)
+    return data_file, label_file
+
+
+@pytest.fixture
+def make_config(dataset, tmp_path):
+    """Build an experiment config on the small dataset; keyword arguments override its keys."""
+    data_file, label_file = dataset
+
+    def make(results_dir="results", **overrides):
+        config = {
+            "experiment_name": "test",
+            "data_file": data_file,
+            "label_file": label_file,
+            "data_limit": 48,
+            "test_size": 0.3,
+            "results_dir": str(tmp_path / results_dir),
+            "appliance_list": APPLIANCES[:2],
+            "models": ["Dummy", "KNNeucli"],
+        }
+        config.update(overrides)
+        return config
+
+    return make
@@ -0,0 +1,81 @@
+import json
+
+import pandas as pd
+
+from detect import run_config
+from journal import Journal, config_hash
+
+
+def read_results(config):
+    return pd.read_csv(f"{config['results_dir']}/{config['experiment_name']}_results.csv")
+
+
+def tamper_journal(config, f1_score):
+    """Overwrite the recorded F1-score of every journaled job, to tell reused results from recomputed ones."""
+    path = f"{config['results_dir']}/{config['experiment_name']}_journal.jsonl"
+    with open(path) as f:
+        entries = [json.loads(line) for line in f]
+    for entry in entries:
+        entry["result"]["F1Score"] = f1_score
+    with open(path, "w") as f:
+        f.writelines(json.dumps(entry) + "\n" for entry in entries)
+
+
+def test_resume_skips_finished_jobs(make_config):
+    config = make_config()
+    run_config(config)
+    tamper_journal(config, -1.0)
+
+    run_config(config, resume=True)
+    assert (read_results(config)["F1Score"] == -1.0).all()
+
+    # Without --resume the journal is started afresh
+    run_config(config)
+    assert (read_results(config)["F1Score"] >= 0).all()
+
+
+def test_resume_reruns_jobs_of_a_changed_config(make_config):
+    config = make_config()
+    run_config(config)
+    tamper_journal(config, -1.0)
+
+    changed = dict(config, test_size=0.4)
+    run_config(changed, resume=True)
+    assert (read_results(changed)["F1Score"] >= 0).all()
+
+
+def test_resume_runs_only_added_jobs(make_config):
+    config = make_config(appliance_list=["cooling_ON"])
+    run_config(config)
+    tamper_journal(config, -1.0)
+
+    extended = dict(config, appliance_list=["cooling_ON", "fans_ON"], n_jobs=2)
+    run_config(extended, resume=True)
+    results = read_results(extended).set_index("Appliance")
+    assert (results.loc["cooling_ON", "F1Score"] == -1.0).all()
+    assert (results.loc["fans_ON", "F1Score"] >= 0).all()
+
+
+def test_config_hash_ignores_only_how_the_sweep_runs():
+    config = {"experiment_name": "test", "test_size": 0.3, "appliance_list": ["cooling_ON"], "models": ["Dummy"]}
+    digest = config_hash(config, "data", "labels")
+    assert config_hash(dict(config, n_jobs=4, save_models=True, models=["Dummy", "Rocket"]), "data", "labels") == digest
+    assert config_hash(dict(config, appliance_list=["fans_ON"]), "data", "labels") == digest
+    assert config_hash(dict(config, test_size=0.4), "data", "labels") != digest
+    assert config_hash(config, "other data", "labels") != digest
+
+    # Folds stratified over every appliance change with the appliance list
+    cv = dict(config, cv_folds=3)
+    assert config_hash(dict(cv, appliance_list=["fans_ON"]), "data", "labels") != config_hash(cv, "data", "labels")
+
+
+def test_journal_keeps_entries_of_the_current_hash(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    row = pd.DataFrame([{"Appliance": "cooling_ON", "Model": "Dummy", "F1Score": 0.5}])
+    Journal(path, "old").record(row)
+    with open(path, "a") as f:
+        f.write('{"config_hash": "old", "appliance": "fans_')  # torn by a crash mid-write
+
+    assert Journal(path, "old", resume=True).result("cooling_ON", "Dummy").equals(row)
+    assert Journal(path, "new", resume=True).result("cooling_ON", "Dummy") is None
+    assert Journal(path, "old").result("cooling_ON", "Dummy") is None
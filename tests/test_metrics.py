@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from sklearn import metrics as skm
+
+from metrics import compute_metrics, best_threshold, threshold_sweep
+
+
+def sklearn_metrics(y_true, y_pred, y_score=None):
+    metrics = {
+        "Accuracy": skm.accuracy_score(y_true, y_pred),
+        "Precision": skm.precision_score(y_true, y_pred, zero_division=0),
+        "Recall": skm.recall_score(y_true, y_pred, zero_division=0),
+        "PrecisionMacro": skm.precision_score(y_true, y_pred, average="macro", labels=[0, 1], zero_division=0),
+        "RecallMacro": skm.recall_score(y_true, y_pred, average="macro", labels=[0, 1], zero_division=0),
+        "F1Score": skm.f1_score(y_true, y_pred, zero_division=0),
+        "F1ScoreMacro": skm.f1_score(y_true, y_pred, average="macro", labels=[0, 1], zero_division=0),
+        "F1ScoreWeighted": skm.f1_score(y_true, y_pred, average="weighted", labels=[0, 1], zero_division=0),
+    }
+    if y_score is not None:
+        metrics["ROC_AUC"] = skm.roc_auc_score(y_true, y_score)
+        metrics["PR_AUC"] = skm.average_precision_score(y_true, y_score)
+    return metrics
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_metrics_match_sklearn(seed):
+    rng = np.random.RandomState(seed)
+    y_true = rng.randint(0, 2, 200)
+    # Rounded scores give ties, which the sweep has to handle like sklearn
+    y_score = np.round(0.4 * y_true + rng.rand(200), 1)
+    y_pred = (y_score >= 0.7).astype(int)
+
+    metrics = compute_metrics(y_true, y_pred, "test", y_score)
+    for name, expected in sklearn_metrics(y_true, y_pred, y_score).items():
+        assert metrics[name] == pytest.approx(expected, abs=1e-5), name
+
+
+def test_metrics_without_scores_sweep_the_predictions():
+    y_true = np.array([1, 1, 1, 0, 0, 0, 0, 1])
+    y_pred = np.array([1, 0, 1, 0, 1, 0, 0, 1])
+
+    metrics = compute_metrics(y_true, y_pred, "test")
+    assert metrics["ROC_AUC"] == pytest.approx(skm.balanced_accuracy_score(y_true, y_pred), abs=1e-5)
+    assert metrics["PR_AUC"] == pytest.approx(skm.average_precision_score(y_true, y_pred), abs=1e-5)
+
+
+@pytest.mark.parametrize("label", [0, 1])
+def test_single_class_test_set(label):
+    y_true = np.full(10, label)
+    y_pred = np.array([1, 0] * 5)
+
+    metrics = compute_metrics(y_true, y_pred, "test", y_score=np.linspace(0, 1, 10))
+    for name, expected in sklearn_metrics(y_true, y_pred).items():
+        assert metrics[name] == pytest.approx(expected, abs=1e-5), name
+    # sklearn refuses ROC AUC on one class; it is reported as missing
+    assert np.isnan(metrics["ROC_AUC"]) and np.isnan(metrics["PR_AUC"])
+
+
+def test_threshold_sweep_counts_rows_at_or_above_each_threshold():
+    y_true = np.array([1, 0, 1, 1, 0])
+    y_score = np.array([0.9, 0.8, 0.8, 0.3, 0.1])
+
+    thresholds, tps, fps = threshold_sweep(y_true, y_score)
+    assert thresholds.tolist() == [0.9, 0.8, 0.3, 0.1]
+    assert tps.tolist() == [1, 2, 3, 3]
+    assert fps.tolist() == [0, 1, 1, 2]
+
+
+def test_best_threshold_and_f1_at_threshold():
+    y_train = np.array([1, 1, 0, 1, 0, 0])
+    train_scores = np.array([-0.2, 0.4, 0.1, 0.9, -0.5, -0.8])
+    # Keeping the three highest scores positive is F1-optimal; the cut sits halfway to the next score
+    threshold = best_threshold(y_train, train_scores)
+    assert threshold == pytest.approx(-0.35)
+
+    y_test = np.array([1, 0, 1, 0])
+    test_scores = np.array([0.5, -0.3, -0.4, 0.2])
+    metrics = compute_metrics(y_test, test_scores > 0, "test", test_scores, threshold)
+    assert metrics["Threshold"] == pytest.approx(-0.35)
+    assert metrics["F1ScoreAtThreshold"] == pytest.approx(skm.f1_score(y_test, test_scores >= threshold))
+
+
+def test_best_threshold_without_positives():
+    assert np.isnan(best_threshold(np.zeros(4), np.arange(4)))
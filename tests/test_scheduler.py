@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from detect import run_config
+
+
+def read_results(config):
+    return pd.read_csv(f"{config['results_dir']}/{config['experiment_name']}_results.csv")
+
+
+@pytest.mark.parametrize("overrides", [{}, {"multilabel": True}, {"cv_folds": 3}], ids=["split", "multilabel", "cv"])
+def test_parallel_jobs_match_sequential_run(make_config, overrides):
+    sequential = make_config("sequential", n_jobs=1, **overrides)
+    parallel = make_config("parallel", n_jobs=2, **overrides)
+    run_config(sequential)
+    run_config(parallel)
+
+    pd.testing.assert_frame_equal(read_results(parallel), read_results(sequential))
+
+
+def test_resolve_n_jobs(monkeypatch):
+    from scheduler import resolve_n_jobs
+
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    assert [resolve_n_jobs(n) for n in (None, 0, 1, 3, -1, -2, -20)] == [1, 1, 1, 3, 8, 7, 1]
@@ -0,0 +1,52 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+
+from detect import run_config
+from model_store import PerApplianceModel, infer_score_type, positive_scores
+from score import score
+
+
+def saved_models(config):
+    return sorted(glob.glob(os.path.join(config["results_dir"], f"{config['experiment_name']}_models", "*")))
+
+
+@pytest.mark.parametrize("overrides", [{}, {"multilabel": True}], ids=["split", "multilabel"])
+def test_scores_are_named_and_thresholded_like_the_evaluation(make_config, dataset, tmp_path, overrides):
+    config = make_config(models=["Dummy", "KNNeucli", "Minirocket"], feature_cache="memory", save_models=True,
+                         **overrides)
+    run_config(config)
+    output = str(tmp_path / "scores.csv")
+    score(saved_models(config), dataset[0], output)
+    scores = pd.read_csv(output)
+    assert not [column for column in scores.columns if column.endswith("_score")]
+
+    for path in saved_models(config):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        assert meta["score_type"] == ("margin" if meta["model"] == "Minirocket" else "proba")
+        for appliance, threshold in zip(meta["appliances"], meta["thresholds"]):
+            column = f"{appliance}_{meta['model']}"
+            values = scores[f"{column}_{meta['score_type']}"]
+            assert np.array_equal(scores[f"{column}_pred"], (values >= threshold - 1e-6).astype(int))
+
+
+def test_per_appliance_model_scores_like_its_estimators():
+    rng = np.random.RandomState(0)
+    X, Y = rng.rand(40, 5), rng.rand(40, 2) < 0.5
+
+    margins = PerApplianceModel([LogisticRegression().fit(X, Y[:, j]) for j in range(2)])
+    assert infer_score_type(margins) == "margin"
+    assert positive_scores(margins, X).shape == (40, 2)
+    assert np.allclose(positive_scores(margins, X)[:, 1], margins.estimators[1].decision_function(X))
+
+    probabilities = PerApplianceModel([KNeighborsClassifier(3).fit(X, Y[:, j]) for j in range(2)])
+    assert not hasattr(probabilities, "decision_function")
+    assert infer_score_type(probabilities) == "proba"
+    assert np.allclose(positive_scores(probabilities, X)[:, 0], probabilities.estimators[0].predict_proba(X)[:, 1])
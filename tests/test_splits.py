@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from splits import iterative_stratification, iterative_train_test_split, cross_validation_folds
+
+
+@pytest.fixture
+def labels():
+    rng = np.random.RandomState(1)
+    return (rng.rand(300, 4) < [0.5, 0.2, 0.08, 0.03]).astype(int)
+
+
+def test_every_fold_keeps_each_label_proportion(labels):
+    folds = iterative_stratification(labels, [0.2] * 5, random_state=0)
+
+    assert sorted(np.unique(folds)) == [0, 1, 2, 3, 4]
+    assert np.all(np.abs(np.bincount(folds) - 60) <= 1)
+    expected = labels.sum(axis=0) / 5
+    for fold in range(5):
+        # Each fold holds its share of every label's positives, up to rounding
+        assert np.all(np.abs(labels[folds == fold].sum(axis=0) - expected) <= 1)
+
+
+def test_train_test_split_is_a_stratified_partition(labels):
+    train_idx, test_idx = iterative_train_test_split(labels, 0.3, random_state=0)
+
+    assert len(np.intersect1d(train_idx, test_idx)) == 0
+    assert np.array_equal(np.sort(np.r_[train_idx, test_idx]), np.arange(len(labels)))
+    assert abs(len(test_idx) - 90) <= 1
+    assert np.all(np.abs(labels[test_idx].sum(axis=0) - 0.3 * labels.sum(axis=0)) <= 1)
+
+
+def test_cross_validation_test_folds_cover_every_sample_once_per_repeat(labels):
+    splits = cross_validation_folds(labels, 3, n_repeats=2, random_state=0)
+
+    assert len(splits) == 6
+    for repeat in range(2):
+        test_folds = [test_idx for _, test_idx in splits[3 * repeat:3 * repeat + 3]]
+        assert np.array_equal(np.sort(np.concatenate(test_folds)), np.arange(len(labels)))
+    for train_idx, test_idx in splits:
+        assert len(np.intersect1d(train_idx, test_idx)) == 0
+        assert len(train_idx) + len(test_idx) == len(labels)
+    # Each repeat reshuffles the folds
+    assert not np.array_equal(splits[0][1], splits[3][1])
+
+
+def test_splits_are_reproducible(labels):
+    first = iterative_train_test_split(labels, 0.3, random_state=42)
+    second = iterative_train_test_split(labels, 0.3, random_state=42)
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+
+def test_single_label_vector_and_unlabelled_samples():
+    y = np.r_[np.ones(10), np.zeros(20)]
+    folds = iterative_stratification(y, [0.5, 0.5], random_state=0)
+    assert np.bincount(folds).tolist() == [15, 15]
+    assert np.bincount(folds[:10]).tolist() == [5, 5]
@@ -0,0 +1,115 @@
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+import sweep
+from detect import run_config
+from sweep import WorkQueue, ALL
+
+
+def read_results(config):
+    return pd.read_csv(f"{config['results_dir']}/{config['experiment_name']}_results.csv")
+
+
+def run_sweep(config, queue_path, n_workers=2):
+    """Submit one experiment, drain it with local worker processes and merge the task results."""
+    WorkQueue(queue_path).submit(config)
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=sweep.spawn_worker, args=(queue_path, 60, None)) for _ in range(n_workers)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    assert all(process.exitcode == 0 for process in workers)
+    sweep.merge(queue_path)
+
+
+@pytest.mark.parametrize("overrides", [{}, {"cv_folds": 3}, {"multilabel": True}], ids=["split", "cv", "multilabel"])
+def test_merged_results_match_sequential_run(make_config, tmp_path, overrides):
+    sequential = make_config("sequential", **overrides)
+    run_config(sequential)
+
+    distributed = make_config("distributed", **overrides)
+    run_sweep(distributed, str(tmp_path / "queue.db"))
+
+    assert WorkQueue(str(tmp_path / "queue.db")).counts() == {"test": {"done": len(sweep.task_units(distributed))}}
+    pd.testing.assert_frame_equal(read_results(distributed), read_results(sequential))
+
+
+def test_task_units_follow_what_run_config_trains_together(make_config):
+    config = make_config()
+    assert sweep.task_units(config) == [("cooling_ON", "Dummy"), ("cooling_ON", "KNNeucli"),
+                                        ("fans_ON", "Dummy"), ("fans_ON", "KNNeucli")]
+    # Folds are stratified over every appliance, so a task needs all of them
+    assert sweep.task_units(dict(config, cv_folds=3)) == [(ALL, "Dummy"), (ALL, "KNNeucli")]
+    assert sweep.task_units(dict(config, multilabel=True)) == [(ALL, "Dummy"), (ALL, "KNNeucli")]
+    assert sweep.task_units(dict(config, time_budget=10)) == [("cooling_ON", ALL), ("fans_ON", ALL)]
+
+
+def test_claim_hands_out_each_task_once(make_config, tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    assert queue.submit(make_config()) == 4
+    # Submitting again leaves the queued tasks alone
+    assert queue.submit(make_config()) == 0
+
+    claimed = [queue.claim(f"w{i}") for i in range(4)]
+    assert sorted(task["id"] for task in claimed) == [1, 2, 3, 4]
+    assert queue.claim("w4") is None
+
+    assert queue.complete(claimed[0]["id"], "w0")
+    # Only the lease holder can complete its task
+    assert not queue.complete(claimed[1]["id"], "w0")
+    assert queue.counts() == {"test": {"done": 1, "running": 3}}
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(make_config, tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.submit(make_config(appliance_list=["cooling_ON"], models=["Dummy"]))
+
+    first = queue.claim("dead", lease=-1)
+    second = queue.claim("alive")
+    assert second["id"] == first["id"]
+    assert second["attempts"] == 1
+
+    # The worker that lost its lease can neither renew nor complete the task
+    assert not queue.renew(first["id"], "dead")
+    assert not queue.complete(first["id"], "dead")
+    assert queue.complete(second["id"], "alive")
+
+
+def test_expired_lease_on_last_attempt_fails_the_task(make_config, tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.submit(make_config(appliance_list=["cooling_ON"], models=["Dummy"]), max_attempts=1)
+
+    queue.claim("dead", lease=-1)
+    assert queue.claim("alive") is None
+    assert queue.counts() == {"test": {"failed": 1}}
+
+
+def test_failed_attempts_are_retried_then_marked_failed(make_config, tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.submit(make_config(appliance_list=["cooling_ON"], models=["Dummy"]), max_attempts=2)
+
+    task = queue.claim("w")
+    queue.fail(task["id"], "w", "RuntimeError: boom")
+    assert queue.counts() == {"test": {"pending": 1}}
+    task = queue.claim("w")
+    queue.fail(task["id"], "w", "RuntimeError: boom")
+    assert queue.counts() == {"test": {"failed": 1}}
+    assert queue.tasks()[0]["error"] == "RuntimeError: boom"
+
+    assert queue.retry_failed() == 1
+    assert queue.claim("w")["id"] == task["id"]
+
+
+def test_worker_retries_a_crashing_task(make_config, tmp_path):
+    queue_path = str(tmp_path / "queue.db")
+    config = make_config(appliance_list=["cooling_ON"], models=["Dummy"], data_file=str(tmp_path / "missing.csv"))
+    WorkQueue(queue_path).submit(config, max_attempts=2)
+
+    sweep.work(queue_path, lease=60)
+
+    task = WorkQueue(queue_path).tasks()[0]
+    assert (task["status"], task["attempts"]) == ("failed", 2)
+    assert task["error"]
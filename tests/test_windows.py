@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from windows import window_starts, window_view, WindowedClassifier
+
+
+@pytest.mark.parametrize("n_points, window, stride, max_windows, expected", [
+    (10, 10, 1, None, [0]),                         # the series is exactly one window
+    (15, 10, 20, None, [0]),                        # stride longer than the slack
+    (20, 5, 5, None, [0, 5, 10, 15]),               # windows tile the series
+    (22, 5, 5, None, [0, 5, 10, 15]),               # a partial last window is dropped
+    (20, 5, 5, 4, [0, 5, 10, 15]),                  # cap not reached
+    (100, 10, 1, 10, list(range(0, 91, 10))),       # 91 windows widened to every 10th
+    (100, 10, 1, 32, list(range(0, 91, 3))),        # widening never exceeds the cap
+    (100, 10, 1, 1, [0]),
+])
+def test_window_starts(n_points, window, stride, max_windows, expected):
+    assert window_starts(n_points, window, stride, max_windows).tolist() == expected
+
+
+def test_window_longer_than_series():
+    with pytest.raises(ValueError, match="shorter than"):
+        window_starts(9, 10, 1)
+
+
+@pytest.mark.parametrize("stride, max_windows", [(1, None), (3, None), (1, 4), (8, None)])
+def test_window_view_matches_starts(stride, max_windows):
+    X = np.arange(3 * 12, dtype=np.float32).reshape(3, 12)
+    view = window_view(X, 5, stride, max_windows)
+
+    starts = window_starts(12, 5, stride, max_windows)
+    assert view.shape == (3, len(starts), 5)
+    for i, start in enumerate(starts):
+        assert np.array_equal(view[:, i], X[:, start:start + 5])
+    # Windows are a view of X, not a copy
+    assert np.shares_memory(view, X)
+
+
+class ThresholdClassifier:
+    """Predicts 1 for windows whose mean is positive."""
+    classes_ = np.array([0, 1])
+
+    def fit(self, X, y):
+        self.n_fit_ = len(X)
+        return self
+
+    def predict_proba(self, X):
+        positive = (X.mean(axis=1) > 0).astype(float)
+        return np.c_[1 - positive, positive]
+
+    def predict(self, X):
+        return (X.mean(axis=1) > 0).astype(int)
+
+
+@pytest.mark.parametrize("aggregation", ["vote", "proba"])
+def test_windowed_classifier_aggregates_per_building(aggregation):
+    # Building 0 is positive in 3 of its 4 windows, building 1 in 1 of 4
+    X = np.array([[1, 1, 1, 1, 1, 1, -1, -1],
+                  [-1, -1, -1, -1, -1, -1, 1, 1]], dtype=float)
+    clf = WindowedClassifier(ThresholdClassifier(), window=2, stride=2, aggregation=aggregation).fit(X, np.array([1, 0]))
+
+    assert clf.estimator.n_fit_ == 8
+    assert np.allclose(clf.predict_proba(X)[:, 1], [0.75, 0.25])
+    assert clf.predict(X).tolist() == [1, 0]
+
+
+def test_windowed_classifier_rejects_unknown_aggregation():
+    with pytest.raises(ValueError, match="aggregation"):
+        WindowedClassifier(ThresholdClassifier(), window=2, aggregation="mean")